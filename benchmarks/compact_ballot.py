@@ -0,0 +1,75 @@
+"""
+Compares the size of complete and compact ballots, and the cost of restoring
+the proof commitments of the compact ones when verifying them.
+
+    python -m benchmarks.compact_ballot --ballots 16
+"""
+
+from argparse import ArgumentParser
+from time import perf_counter
+from electionguard.ballot import CiphertextBallot
+from decidim.electionguard.batch_verifier import ballots_are_valid_for_election
+from decidim.electionguard.utils import (
+    BINARY_ENCODING,
+    JSON_ENCODING,
+    deserialize,
+    deserialize_ballot,
+    serialize_ballot,
+)
+from decidim.electionguard.voter import Voter
+from tests.utils import create_election_test_message, joint_election_key_test_message
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ballots", type=int, default=16)
+    args = parser.parse_args()
+
+    voter = Voter("a-voter")
+    voter.process_message("create_election", create_election_test_message())
+    voter.process_message("end_key_ceremony", joint_election_key_test_message())
+    context = voter.context
+    ballots = [
+        deserialize(
+            voter.encrypt(
+                {
+                    "question1": ["question1-yes-selection"],
+                    "question2": ["question2-first-project-selection"],
+                }
+            ),
+            CiphertextBallot,
+        )
+        for _ in range(args.ballots)
+    ]
+
+    print(
+        f"{'encoding':<8} {'format':<9} {'bytes':>8} {'decode':>8} {'verify':>8}"
+        "  (ms per ballot)"
+    )
+    for encoding in [JSON_ENCODING, BINARY_ENCODING]:
+        for compact in [False, True]:
+            contents = [
+                serialize_ballot(ballot, encoding, compact) for ballot in ballots
+            ]
+
+            start = perf_counter()
+            decoded = [
+                deserialize_ballot(content, context.joint_key) for content in contents
+            ]
+            decoded_at = perf_counter()
+            results = ballots_are_valid_for_election(
+                decoded, context.election_metadata, context.election_context
+            )
+            verified_at = perf_counter()
+            assert decoded == ballots and all(results)
+
+            print(
+                f"{encoding:<8} {'compact' if compact else 'complete':<9} "
+                f"{len(contents[0]):>8} "
+                f"{(decoded_at - start) * 1000 / len(ballots):>8.2f} "
+                f"{(verified_at - decoded_at) * 1000 / len(ballots):>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
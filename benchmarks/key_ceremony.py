@@ -0,0 +1,153 @@
+"""
+Drives a bulletin board and `n` trustees through the whole key ceremony and
+reports, for every phase, the wall time, the messages delivered with their
+size and the peak of memory allocated while processing them.
+
+A phase delivers the messages of one type to every participant, so its time
+and memory include the messages produced in response. The ceremony runs twice:
+once to measure the time, and once tracing the memory allocations of this
+process, which slows them down too much to be timed.
+
+    python -m benchmarks.key_ceremony --trustees 3 5 10 20 50
+"""
+
+from argparse import ArgumentParser
+import json
+from time import perf_counter
+import tracemalloc
+from typing import List, NamedTuple, Optional
+from decidim.electionguard.bulletin_board import BulletinBoard
+from decidim.electionguard.common import Content
+from decidim.electionguard.dummy_scheduler import (
+    DummyScheduler,
+    PoolScheduler,
+    Scheduler,
+)
+from decidim.electionguard.trustee import Trustee
+from tests.utils import create_election_test_message
+
+TRUSTEE_COUNTS = [3, 5, 10, 20, 50]
+
+
+class PhaseResult(NamedTuple):
+    phase: str
+    seconds: float
+    messages: int
+    bytes: int
+    peak_memory: int
+
+
+def election_message(number_of_trustees: int, quorum: int) -> dict:
+    message = create_election_test_message()
+    message["scheme"]["quorum"] = quorum
+    message["trustees"] = [
+        {"name": f"trustee-{i}", "public_key": "..."} for i in range(number_of_trustees)
+    ]
+    return message
+
+
+def message_size(message: Optional[Content]) -> int:
+    if message is None:
+        return 0
+    content = message.get("content", message)
+    if not isinstance(content, str):
+        content = json.dumps(content)
+    return len(content.encode())
+
+
+def deliver(
+    phase: str, messages: List[Content], participants: list, trace_memory: bool
+) -> tuple:
+    if trace_memory:
+        tracemalloc.start()
+    start = perf_counter()
+    responses = [
+        response
+        for message in messages
+        for participant in participants
+        for response in participant.process_message(phase, message)
+    ]
+    seconds = perf_counter() - start
+    peak_memory = 0
+    if trace_memory:
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return responses, PhaseResult(
+        phase,
+        seconds,
+        len(messages),
+        sum(message_size(message) for message in messages),
+        peak_memory,
+    )
+
+
+def run_key_ceremony(
+    number_of_trustees: int, quorum: int, scheduler: Scheduler, trace_memory: bool
+) -> List[PhaseResult]:
+    election = election_message(number_of_trustees, quorum)
+    bulletin_board = BulletinBoard(scheduler=scheduler)
+    trustees = [
+        Trustee(trustee["name"], scheduler=scheduler)
+        for trustee in election["trustees"]
+    ]
+    participants = [bulletin_board, *trustees]
+
+    results = []
+    messages: List[Content] = [election]
+    for phase in [
+        "create_election",
+        "start_key_ceremony",
+        "key_ceremony.trustee_election_keys",
+        "key_ceremony.trustee_partial_election_keys",
+        "key_ceremony.trustee_verification",
+    ]:
+        if phase == "start_key_ceremony":
+            messages = [None]
+        messages, result = deliver(phase, messages, participants, trace_memory)
+        results.append(result)
+
+    # the joint key is published by the bulletin board
+    _, result = deliver("end_key_ceremony", messages, trustees, trace_memory)
+    results.append(result)
+
+    assert all(trustee.is_key_ceremony_done() for trustee in trustees)
+    return results
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trustees", type=int, nargs="+", default=TRUSTEE_COUNTS)
+    parser.add_argument(
+        "--quorum", type=float, default=0.5, help="quorum as a share of trustees"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=0, help="worker processes, 0 to run inline"
+    )
+    args = parser.parse_args()
+
+    scheduler = PoolScheduler(args.workers) if args.workers else DummyScheduler()
+    print(
+        f"{'trustees':>8} {'quorum':>6} {'phase':<42} {'seconds':>9} "
+        f"{'messages':>8} {'bytes':>12} {'peak memory':>12}"
+    )
+    try:
+        for number_of_trustees in args.trustees:
+            quorum = max(
+                1, min(number_of_trustees, int(number_of_trustees * args.quorum) + 1)
+            )
+            timed = run_key_ceremony(number_of_trustees, quorum, scheduler, False)
+            traced = run_key_ceremony(number_of_trustees, quorum, scheduler, True)
+            for result, traced_result in zip(timed, traced):
+                result = result._replace(peak_memory=traced_result.peak_memory)
+                print(
+                    f"{number_of_trustees:>8} {quorum:>6} {result.phase:<42} "
+                    f"{result.seconds:>9.3f} {result.messages:>8} "
+                    f"{result.bytes:>12} {result.peak_memory:>12}"
+                )
+    finally:
+        scheduler.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Compares the hand-written codecs with the jsons based serialization for the
+messages exchanged on every ballot, key ceremony and tally step, and the
+binary encoding with the JSON one.
+
+    python -m benchmarks.serialization --repeat 50
+"""
+
+from argparse import ArgumentParser
+from timeit import timeit
+from typing import Any, Dict, List, Tuple
+from electionguard.ballot import (
+    BallotBoxState,
+    CiphertextBallot,
+    from_ciphertext_ballot,
+)
+from electionguard.decryption import compute_decryption_share_for_selection
+from electionguard.decryption_share import CiphertextDecryptionContest
+from electionguard.guardian import Guardian
+from electionguard.key_ceremony import PublicKeySet
+from electionguard.serializable import read_json, write_json
+from electionguard.tally import CiphertextTally, CiphertextTallyContest
+from decidim.electionguard.dummy_scheduler import DummyScheduler
+from decidim.electionguard.messages import TrusteePartialKeys, TrusteeShare
+from decidim.electionguard.utils import (
+    BINARY_ENCODING,
+    deserialize,
+    serialize,
+    serialize_content,
+)
+from decidim.electionguard.voter import Voter
+from tests.utils import create_election_test_message, joint_election_key_test_message
+
+
+def build_messages() -> List[Tuple[str, Any, Any]]:
+    voter = Voter("a-voter")
+    voter.process_message("create_election", create_election_test_message())
+    voter.process_message("end_key_ceremony", joint_election_key_test_message())
+    context = voter.context
+    ballot = deserialize(
+        voter.encrypt(
+            {
+                "question1": ["question1-yes-selection"],
+                "question2": ["question2-first-project-selection"],
+            }
+        ),
+        CiphertextBallot,
+    )
+
+    guardians = [Guardian(name, order, 3, 2) for order, name in enumerate("abc")]
+    for guardian in guardians:
+        for other in guardians:
+            if guardian is not other:
+                guardian.save_guardian_public_keys(other.share_public_keys())
+    guardian = guardians[0]
+    guardian.generate_election_partial_key_backups()
+
+    tally = CiphertextTally(
+        "election-results", context.election_metadata, context.election_context
+    )
+    tally.append(from_ciphertext_ballot(ballot, BallotBoxState.CAST), DummyScheduler())
+    share = TrusteeShare(
+        guardian_id=guardian.object_id,
+        public_key=guardian.share_election_public_key().key,
+        contests={
+            contest.object_id: CiphertextDecryptionContest(
+                contest.object_id,
+                guardian.object_id,
+                contest.description_hash,
+                {
+                    selection.object_id: compute_decryption_share_for_selection(
+                        guardian, selection, context.election_context
+                    )
+                    for selection in contest.tally_selections.values()
+                },
+            )
+            for contest in tally.cast.values()
+        },
+    )
+
+    return [
+        ("CiphertextBallot", ballot, CiphertextBallot),
+        ("PublicKeySet", guardian.share_public_keys(), PublicKeySet),
+        (
+            "TrusteePartialKeys",
+            TrusteePartialKeys(
+                guardian_id=guardian.object_id,
+                partial_keys=[
+                    guardian.share_election_partial_key_backup(other.object_id)
+                    for other in guardians[1:]
+                ],
+            ),
+            TrusteePartialKeys,
+        ),
+        ("TrusteeShare", share, TrusteeShare),
+        ("tally cast", tally.cast, Dict[str, CiphertextTallyContest]),
+    ]
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print(
+        f"{'message':<20} {'bytes':>8} {'jsons encode':>13} {'fast encode':>12} "
+        f"{'jsons decode':>13} {'fast decode':>12} {'binary bytes':>13} "
+        f"{'binary encode':>14} {'binary decode':>14}  (ms per message)"
+    )
+    for name, obj, type in build_messages():
+        content = write_json(obj)
+        assert serialize(obj) == content
+        assert deserialize(content, type) == read_json(content, type)
+        binary_content = serialize_content(obj, BINARY_ENCODING)
+        assert deserialize(binary_content, type) == read_json(content, type)
+
+        timings = [
+            timeit(run, number=args.repeat) * 1000 / args.repeat
+            for run in [
+                lambda: write_json(obj),
+                lambda: serialize(obj),
+                lambda: read_json(content, type),
+                lambda: deserialize(content, type),
+                lambda: serialize_content(obj, BINARY_ENCODING),
+                lambda: deserialize(binary_content, type),
+            ]
+        ]
+        print(
+            f"{name:<20} {len(content):>8} {timings[0]:>13.3f} {timings[1]:>12.3f} "
+            f"{timings[2]:>13.3f} {timings[3]:>12.3f} {len(binary_content):>13} "
+            f"{timings[4]:>14.3f} {timings[5]:>14.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
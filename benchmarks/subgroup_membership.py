@@ -0,0 +1,38 @@
+"""
+Compares checking the subgroup membership of group elements one by one with
+the batched check used when verifying ballots and trustee shares.
+
+    python -m benchmarks.subgroup_membership --elements 64 256 1024
+"""
+
+from argparse import ArgumentParser
+from time import perf_counter
+from electionguard.group import g_pow_p, rand_q
+from decidim.electionguard.batch_verifier import (
+    elements_are_valid_residues,
+    is_valid_residue,
+)
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--elements", type=int, nargs="+", default=[64, 256, 1024])
+    args = parser.parse_args()
+
+    print(f"{'elements':>8} {'naive':>10} {'batched':>10} {'speedup':>8}  (ms)")
+    for count in args.elements:
+        elements = [g_pow_p(rand_q()) for _ in range(count)]
+
+        start = perf_counter()
+        assert all(is_valid_residue(element) for element in elements)
+        naive_at = perf_counter()
+        assert elements_are_valid_residues(elements)
+        batched_at = perf_counter()
+
+        naive = (naive_at - start) * 1000
+        batched = (batched_at - naive_at) * 1000
+        print(f"{count:>8} {naive:>10.1f} {batched:>10.1f} {naive / batched:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
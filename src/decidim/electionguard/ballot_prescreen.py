@@ -0,0 +1,133 @@
+from typing import Any, Dict, List, NamedTuple
+from electionguard.election import InternalElectionDescription
+from electionguard.group import P, Q
+from electionguard.types import CONTEST_ID, SELECTION_ID
+from .compact_ballot import is_compact
+from .serializable import maybe_base64_to_int
+
+CIPHERTEXT_ELEMENTS_P = ["pad", "data"]
+DISJUNCTIVE_PROOF_ELEMENTS_P = [
+    "proof_zero_pad",
+    "proof_zero_data",
+    "proof_one_pad",
+    "proof_one_data",
+]
+DISJUNCTIVE_PROOF_ELEMENTS_Q = [
+    "proof_zero_challenge",
+    "proof_one_challenge",
+    "challenge",
+    "proof_zero_response",
+    "proof_one_response",
+]
+CONSTANT_PROOF_ELEMENTS_P = ["pad", "data"]
+CONSTANT_PROOF_ELEMENTS_Q = ["challenge", "response"]
+
+
+class SelectionShape(NamedTuple):
+    description_hash: int
+    is_placeholder: bool
+
+
+class ContestShape(NamedTuple):
+    description_hash: int
+    number_elected: int
+    selections: Dict[SELECTION_ID, SelectionShape]
+
+
+class BallotPrescreen:
+    """
+    Expected shape of the ballots of an election, used to reject malformed or
+    wrong-election ballots from their raw JSON, before deserializing them and
+    verifying their proofs.
+    """
+
+    description_hash: int
+    styles: Dict[str, Dict[CONTEST_ID, ContestShape]]
+
+    def __init__(self, metadata: InternalElectionDescription) -> None:
+        self.description_hash = metadata.description_hash.to_int()
+        self.styles = {}
+        for style in metadata.ballot_styles:
+            self.styles[style.object_id] = {
+                contest.object_id: ContestShape(
+                    contest.crypto_hash().to_int(),
+                    contest.number_elected,
+                    {
+                        selection.object_id: SelectionShape(
+                            selection.crypto_hash().to_int(),
+                            selection in contest.placeholder_selections,
+                        )
+                        for selection in contest.ballot_selections
+                        + contest.placeholder_selections
+                    },
+                )
+                for contest in metadata.get_contests_for(style.object_id)
+            }
+
+    def is_valid(self, ballot: Any) -> bool:
+        try:
+            return self._ballot_is_valid(ballot)
+        except (AttributeError, TypeError, KeyError, ValueError):
+            return False
+
+    def _ballot_is_valid(self, ballot: Dict) -> bool:
+        # compact ballots have their proof commitments restored later
+        compact = is_compact(ballot)
+        contests = self.styles.get(ballot["ballot_style"])
+        if (
+            contests is None
+            or not isinstance(ballot["object_id"], str)
+            or maybe_base64_to_int(ballot["description_hash"]) != self.description_hash
+            or not elements_are_valid(ballot, ["crypto_hash"], Q)
+            or len(ballot["contests"]) != len(contests)
+            or {contest["object_id"] for contest in ballot["contests"]}
+            != contests.keys()
+        ):
+            return False
+
+        return all(
+            self._contest_is_valid(contest, contests[contest["object_id"]], compact)
+            for contest in ballot["contests"]
+        )
+
+    def _contest_is_valid(
+        self, contest: Dict, shape: ContestShape, compact: bool
+    ) -> bool:
+        proof = contest["proof"]
+        selections = contest["ballot_selections"]
+        if (
+            maybe_base64_to_int(contest["description_hash"]) != shape.description_hash
+            or not elements_are_valid(contest, ["crypto_hash"], Q)
+            or proof["constant"] != shape.number_elected
+            or not (compact or elements_are_valid(proof, CONSTANT_PROOF_ELEMENTS_P, P))
+            or not elements_are_valid(proof, CONSTANT_PROOF_ELEMENTS_Q, Q)
+            or len(selections) != len(shape.selections)
+            or {selection["object_id"] for selection in selections}
+            != shape.selections.keys()
+        ):
+            return False
+
+        return all(
+            self._selection_is_valid(
+                selection, shape.selections[selection["object_id"]], compact
+            )
+            for selection in selections
+        )
+
+    def _selection_is_valid(
+        self, selection: Dict, shape: SelectionShape, compact: bool
+    ) -> bool:
+        proof = selection["proof"]
+        return (
+            maybe_base64_to_int(selection["description_hash"]) == shape.description_hash
+            and selection["is_placeholder_selection"] is shape.is_placeholder
+            and elements_are_valid(selection, ["crypto_hash"], Q)
+            and elements_are_valid(selection["ciphertext"], CIPHERTEXT_ELEMENTS_P, P)
+            and (compact or elements_are_valid(proof, DISJUNCTIVE_PROOF_ELEMENTS_P, P))
+            and elements_are_valid(proof, DISJUNCTIVE_PROOF_ELEMENTS_Q, Q)
+        )
+
+
+def elements_are_valid(values: Dict, keys: List[str], modulus: int) -> bool:
+    """Checks that every key holds a serialized integer in [0, modulus)"""
+    return all(0 <= maybe_base64_to_int(values[key]) < modulus for key in keys)
@@ -0,0 +1,359 @@
+from secrets import randbits
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from electionguard.ballot import CiphertextBallot
+from electionguard.ballot_validator import (
+    ballot_is_valid_for_election,
+    ballot_is_valid_for_style,
+)
+from electionguard.chaum_pedersen import (
+    ChaumPedersenProof,
+    ConstantChaumPedersenProof,
+    DisjunctiveChaumPedersenProof,
+)
+from electionguard.decryption_share import CiphertextDecryptionSelection
+from electionguard.election import (
+    CiphertextElectionContext,
+    InternalElectionDescription,
+)
+from electionguard.elgamal import ElGamalCiphertext
+from electionguard.group import (
+    ElementModP,
+    ElementModQ,
+    P,
+    Q,
+    add_q,
+    int_to_q_unchecked,
+    mult_p,
+)
+from electionguard.hash import hash_elems
+from electionguard.tally import CiphertextTallyContest
+from electionguard.types import CONTEST_ID
+from gmpy2 import jacobi, mpz, powmod
+from .fixed_base import g_pow_p, pow_p
+from .messages import TrusteeShare
+
+# Bits of the random weights given to each equation: a batch with an invalid
+# proof passes with probability 2^-WEIGHT_BITS
+WEIGHT_BITS = 64
+WINDOW_BITS = 4
+
+# Ballots verified together when casting a batch
+BATCH_VERIFICATION_SIZE = 16
+
+
+def multi_exp(terms: Iterable[Tuple[int, int]]) -> mpz:
+    """
+    Computes the product of every base^exponent mod P sharing the squarings
+    between all the terms (Straus' method with fixed windows).
+    """
+    terms = [(mpz(base), int(exponent)) for (base, exponent) in terms if exponent]
+    if not terms:
+        return mpz(1)
+
+    window_size = 1 << WINDOW_BITS
+    tables = []
+    for base, _ in terms:
+        table = [mpz(1), base]
+        for _ in range(window_size - 2):
+            table.append(table[-1] * base % P)
+        tables.append(table)
+
+    windows = -(-max(exponent.bit_length() for (_, exponent) in terms) // WINDOW_BITS)
+    result = mpz(1)
+    for window in reversed(range(windows)):
+        for _ in range(WINDOW_BITS):
+            result = result * result % P
+
+        shift = window * WINDOW_BITS
+        for (_, exponent), table in zip(terms, tables):
+            digit = (exponent >> shift) & (window_size - 1)
+            if digit:
+                result = result * table[digit] % P
+
+    return result
+
+
+def is_valid_residue(element: ElementModP) -> bool:
+    return 0 < element.elem < P and powmod(element.elem, Q, P) == 1
+
+
+def elements_are_valid_residues(elements: Iterable[ElementModP]) -> bool:
+    """
+    Same as `is_valid_residue` for all the elements with a single exponentiation.
+    As p - 1 = 2·q·r with r prime, the elements with Jacobi symbol 1 belong to
+    the subgroup of order q·r, and raising their product with random weights
+    to q only gives 1 if all of them are in the subgroup of order q, except
+    with probability 2^-WEIGHT_BITS.
+    """
+    values = [element.elem for element in elements]
+    if not all(0 < value < P and jacobi(value, P) == 1 for value in values):
+        return False
+
+    weights = [randbits(WEIGHT_BITS) | 1 for _ in values]
+    return powmod(weighted_product(values, weights), Q, P) == 1
+
+
+def weighted_product(values: List[mpz], weights: List[int]) -> mpz:
+    """
+    Computes the product of every value^weight mod P for weights below
+    2^WEIGHT_BITS, sharing the multiplications between the values (Pippenger's
+    bucket method).
+    """
+    window_bits = max(1, len(values).bit_length() - 3)
+    mask = (1 << window_bits) - 1
+
+    result = mpz(1)
+    for window in reversed(range(-(-WEIGHT_BITS // window_bits))):
+        for _ in range(window_bits):
+            result = result * result % P
+
+        shift = window * window_bits
+        buckets = [mpz(1)] * (mask + 1)
+        for value, weight in zip(values, weights):
+            digit = (weight >> shift) & mask
+            if digit:
+                buckets[digit] = buckets[digit] * value % P
+
+        # ∏ bucket_d^d, accumulating the buckets from the highest digit
+        running = total = mpz(1)
+        for bucket in reversed(buckets[1:]):
+            running = running * bucket % P
+            total = total * running % P
+        result = result * total % P
+
+    return result
+
+
+class ProofBatch:
+    """
+    Collects the verification equations of many Chaum-Pedersen proofs as
+    g^x · K^y = ∏ base^exponent and checks all of them at once, raising each
+    equation to a random weight and multiplying them together.
+    """
+
+    public_key: ElementModP
+    extended_base_hash: ElementModQ
+
+    g_exponent: int
+    key_exponent: int
+    terms: Dict[int, int]
+    elements: Set[ElementModP]
+
+    def __init__(
+        self, public_key: ElementModP, extended_base_hash: ElementModQ
+    ) -> None:
+        self.public_key = public_key
+        self.extended_base_hash = extended_base_hash
+        self.g_exponent = 0
+        self.key_exponent = 0
+        self.terms = {}
+        self.elements = set()
+
+    def add_disjunctive(
+        self, proof: DisjunctiveChaumPedersenProof, message: ElGamalCiphertext
+    ) -> bool:
+        """Checks the parts of the proof that don't need exponentiations and enqueues the rest"""
+        (alpha, beta) = message
+        a0, b0 = proof.proof_zero_pad, proof.proof_zero_data
+        a1, b1 = proof.proof_one_pad, proof.proof_one_data
+        c0, c1, c = (
+            proof.proof_zero_challenge,
+            proof.proof_one_challenge,
+            proof.challenge,
+        )
+        v0, v1 = proof.proof_zero_response, proof.proof_one_response
+
+        if not (
+            c0.is_in_bounds()
+            and c1.is_in_bounds()
+            and v0.is_in_bounds()
+            and v1.is_in_bounds()
+            and add_q(c0, c1) == c
+            and c == hash_elems(self.extended_base_hash, alpha, beta, a0, b0, a1, b1)
+        ):
+            return False
+
+        self.elements.update([alpha, beta, a0, b0, a1, b1])
+
+        # g^v0 = a0 · α^c0, g^v1 = a1 · α^c1, K^v0 = b0 · β^c0, g^c1 · K^v1 = b1 · β^c1
+        w = [self._weight() for _ in range(4)]
+        self.g_exponent += w[0] * v0.elem + w[1] * v1.elem + w[3] * c1.elem
+        self.key_exponent += w[2] * v0.elem + w[3] * v1.elem
+        self._add_term(a0, w[0])
+        self._add_term(a1, w[1])
+        self._add_term(b0, w[2])
+        self._add_term(b1, w[3])
+        self._add_term(alpha, w[0] * c0.elem + w[1] * c1.elem)
+        self._add_term(beta, w[2] * c0.elem + w[3] * c1.elem)
+        return True
+
+    def add_constant(
+        self, proof: ConstantChaumPedersenProof, message: ElGamalCiphertext
+    ) -> bool:
+        """Checks the parts of the proof that don't need exponentiations and enqueues the rest"""
+        (alpha, beta) = message
+        a, b, c, v = proof.pad, proof.data, proof.challenge, proof.response
+
+        if not (
+            c.is_in_bounds()
+            and v.is_in_bounds()
+            # same arbitrary limit than electionguard, so decryption is performant
+            and 0 <= proof.constant < 1_000_000_000
+            and c == hash_elems(self.extended_base_hash, alpha, beta, a, b)
+        ):
+            return False
+
+        self.elements.update([alpha, beta, a, b])
+
+        # g^v = a · α^c, g^(c·L) · K^v = b · β^c
+        w = [self._weight() for _ in range(2)]
+        self.g_exponent += w[0] * v.elem + w[1] * c.elem * proof.constant
+        self.key_exponent += w[1] * v.elem
+        self._add_term(a, w[0])
+        self._add_term(b, w[1])
+        self._add_term(alpha, w[0] * c.elem)
+        self._add_term(beta, w[1] * c.elem)
+        return True
+
+    def add_chaum_pedersen(
+        self, proof: ChaumPedersenProof, message: ElGamalCiphertext, m: ElementModP
+    ) -> bool:
+        """Checks the parts of the proof that don't need exponentiations and enqueues the rest"""
+        (alpha, beta) = message
+        a, b, c, v = proof.pad, proof.data, proof.challenge, proof.response
+
+        if not (
+            c.is_in_bounds()
+            and v.is_in_bounds()
+            and c == hash_elems(self.extended_base_hash, alpha, beta, a, b, m)
+        ):
+            return False
+
+        self.elements.update([alpha, beta, self.public_key, m, a, b])
+
+        # g^v = a · K^c, α^v = b · M^c
+        w = [self._weight() for _ in range(2)]
+        self.g_exponent += w[0] * v.elem
+        self.key_exponent -= w[0] * c.elem
+        self._add_term(a, w[0])
+        self._add_term(b, w[1])
+        self._add_term(m, w[1] * c.elem)
+        self._add_term(alpha, -w[1] * v.elem)
+        return True
+
+    def is_valid(self) -> bool:
+        if not elements_are_valid_residues(self.elements):
+            return False
+
+        left = mult_p(
+            g_pow_p(int_to_q_unchecked(self.g_exponent % Q)),
+            pow_p(self.public_key, int_to_q_unchecked(self.key_exponent % Q)),
+        ).elem
+        right = multi_exp(
+            (base, exponent % Q) for (base, exponent) in self.terms.items()
+        )
+        return left == right
+
+    def _add_term(self, base: ElementModP, exponent: int) -> None:
+        key = int(base.elem)
+        self.terms[key] = self.terms.get(key, 0) + exponent
+
+    def _weight(self) -> int:
+        return randbits(WEIGHT_BITS) | 1
+
+
+def add_ballot_proofs(
+    batch: ProofBatch,
+    ballot: CiphertextBallot,
+    metadata: InternalElectionDescription,
+) -> bool:
+    """
+    Runs the structural and hash checks of `ballot_is_valid_for_election` and
+    adds the ballot proofs to the batch. Returns False if the ballot is invalid.
+    """
+    if not ballot_is_valid_for_style(ballot, metadata):
+        return False
+
+    if ballot.description_hash != metadata.description_hash or (
+        ballot.crypto_hash != ballot.crypto_hash_with(metadata.description_hash)
+    ):
+        return False
+
+    for contest in ballot.contests:
+        if (
+            contest.proof is None
+            or contest.crypto_hash != contest.crypto_hash_with(contest.description_hash)
+            or not batch.add_constant(contest.proof, contest.elgamal_accumulate())
+        ):
+            return False
+
+        for selection in contest.ballot_selections:
+            if (
+                selection.proof is None
+                or selection.crypto_hash
+                != selection.crypto_hash_with(selection.description_hash)
+                or not batch.add_disjunctive(selection.proof, selection.ciphertext)
+            ):
+                return False
+
+    return True
+
+
+def ballots_are_valid_for_election(
+    ballots: List[CiphertextBallot],
+    metadata: InternalElectionDescription,
+    context: CiphertextElectionContext,
+) -> List[bool]:
+    """
+    Same as `ballot_is_valid_for_election` for each ballot, verifying all the
+    proofs of the ballots with a single combined check. When that check
+    fails, ballots are verified one by one to find the invalid ones.
+    """
+    batch = ProofBatch(context.elgamal_public_key, context.crypto_extended_base_hash)
+    results = [add_ballot_proofs(batch, ballot, metadata) for ballot in ballots]
+
+    if not any(results) or batch.is_valid():
+        return results
+
+    return [
+        valid and ballot_is_valid_for_election(ballot, metadata, context)
+        for (ballot, valid) in zip(ballots, results)
+    ]
+
+
+def share_is_valid(
+    share: TrusteeShare,
+    tally_cast: Dict[CONTEST_ID, CiphertextTallyContest],
+    extended_base_hash: ElementModQ,
+) -> bool:
+    """
+    Same as `is_valid` for the decryption of every selection of the tally in
+    the share, verifying all their proofs with a single combined check.
+    """
+    batch = ProofBatch(share.public_key, extended_base_hash)
+    for contest in tally_cast.values():
+        decryptions = share.contests.get(contest.object_id)
+        for selection in contest.tally_selections.values():
+            if not add_decryption(
+                batch,
+                decryptions and decryptions.selections.get(selection.object_id),
+                selection.ciphertext,
+            ):
+                return False
+
+    return batch.is_valid()
+
+
+def add_decryption(
+    batch: ProofBatch,
+    decryption: Optional[CiphertextDecryptionSelection],
+    message: ElGamalCiphertext,
+) -> bool:
+    if decryption is None:
+        return False
+
+    # decryptions recovered for missing guardians are verified on their own
+    if decryption.proof is None:
+        return decryption.is_valid(message, batch.public_key, batch.extended_base_hash)
+
+    return batch.add_chaum_pedersen(decryption.proof, message, decryption.share)
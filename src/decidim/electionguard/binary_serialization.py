@@ -0,0 +1,162 @@
+"""
+Compact binary alternative to the JSON messages, negotiated per message. It
+writes the same values as JSON, as records made of a one byte tag and:
+
+* group elements: fixed width big-endian integers, with the size of p or q
+* integers: a 4 bytes length and a big-endian signed integer
+* strings: a 4 bytes length and the UTF-8 bytes
+* lists and objects: a 4 bytes count and the items, keys before values
+* true, false and null: nothing else
+
+Group elements are decoded as plain integers, which the deserializers accept
+as well as their base64 JSON encoding.
+"""
+
+from struct import Struct, error as StructError
+from typing import Any, Tuple
+from electionguard.group import ElementModP, ElementModQ, P, Q
+
+MAGIC = b"EGB\x01"
+P_SIZE = (int(P).bit_length() + 7) // 8
+Q_SIZE = (int(Q).bit_length() + 7) // 8
+LENGTH = Struct(">I")
+
+NULL = b"n"
+TRUE = b"t"
+FALSE = b"f"
+ELEMENT_MOD_P = b"p"
+ELEMENT_MOD_Q = b"q"
+INTEGER = b"i"
+STRING = b"s"
+LIST = b"l"
+OBJECT = b"o"
+
+
+def is_binary(content: Any) -> bool:
+    return isinstance(content, (bytes, bytearray)) and content[:4] == MAGIC
+
+
+def encode_binary(value: Any) -> bytes:
+    output = bytearray(MAGIC)
+    write_value(output, value)
+    return bytes(output)
+
+
+def decode_binary(content: bytes) -> Any:
+    if not is_binary(content):
+        raise ValueError("Not a binary message")
+
+    try:
+        value, offset = read_value(memoryview(content), len(MAGIC))
+    except (IndexError, StructError) as error:
+        raise ValueError(f"Truncated binary message: {error}")
+
+    if offset != len(content):
+        raise ValueError("Unexpected data after the binary message")
+    return value
+
+
+def write_value(output: bytearray, value: Any) -> None:
+    # group elements are tuples, they are checked before lists
+    if isinstance(value, ElementModP):
+        output += ELEMENT_MOD_P + int(value.to_int()).to_bytes(P_SIZE, "big")
+    elif isinstance(value, ElementModQ):
+        output += ELEMENT_MOD_Q + int(value.to_int()).to_bytes(Q_SIZE, "big")
+    elif isinstance(value, (list, tuple)):
+        output += LIST + LENGTH.pack(len(value))
+        for item in value:
+            write_value(output, item)
+    elif isinstance(value, dict):
+        output += OBJECT + LENGTH.pack(len(value))
+        for key, item in value.items():
+            write_string(output, b"", key)
+            write_value(output, item)
+    else:
+        write_scalar(output, value)
+
+
+def write_scalar(output: bytearray, value: Any) -> None:
+    if value is None:
+        output += NULL
+    elif value is True:
+        output += TRUE
+    elif value is False:
+        output += FALSE
+    elif isinstance(value, int):
+        value = int(value)
+        data = value.to_bytes(value.bit_length() // 8 + 1, "big", signed=True)
+        output += INTEGER + LENGTH.pack(len(data)) + data
+    elif isinstance(value, str):
+        write_string(output, STRING, value)
+    else:
+        raise TypeError(f"Can't encode a {value.__class__.__name__} in binary")
+
+
+def write_string(output: bytearray, tag: bytes, value: str) -> None:
+    data = value.encode("utf-8")
+    output += tag + LENGTH.pack(len(data)) + data
+
+
+def read_value(data: memoryview, offset: int) -> Tuple[Any, int]:
+    end = offset + 1
+    tag = bytes(data[offset:end])
+    offset = end
+
+    if tag in SIMPLE_VALUES:
+        return SIMPLE_VALUES[tag], offset
+    if tag == ELEMENT_MOD_P:
+        return read_integer(data, offset, P_SIZE, False)
+    if tag == ELEMENT_MOD_Q:
+        return read_integer(data, offset, Q_SIZE, False)
+    if tag == INTEGER:
+        (length,) = LENGTH.unpack_from(data, offset)
+        return read_integer(data, offset + LENGTH.size, length, True)
+    if tag == STRING:
+        return read_string(data, offset)
+    if tag == LIST:
+        return read_list(data, offset)
+    if tag == OBJECT:
+        return read_object(data, offset)
+
+    raise ValueError(f"Unknown binary record {tag!r}")
+
+
+SIMPLE_VALUES = {NULL: None, TRUE: True, FALSE: False}
+
+
+def read_integer(
+    data: memoryview, offset: int, size: int, signed: bool
+) -> Tuple[int, int]:
+    end = offset + size
+    if end > len(data):
+        raise IndexError("integer out of the message")
+    return int.from_bytes(data[offset:end], "big", signed=signed), end
+
+
+def read_string(data: memoryview, offset: int) -> Tuple[str, int]:
+    (length,) = LENGTH.unpack_from(data, offset)
+    start = offset + LENGTH.size
+    end = start + length
+    if end > len(data):
+        raise IndexError("string out of the message")
+    return str(data[start:end], "utf-8"), end
+
+
+def read_list(data: memoryview, offset: int) -> Tuple[list, int]:
+    (count,) = LENGTH.unpack_from(data, offset)
+    offset += LENGTH.size
+    values = []
+    for _ in range(count):
+        value, offset = read_value(data, offset)
+        values.append(value)
+    return values, offset
+
+
+def read_object(data: memoryview, offset: int) -> Tuple[dict, int]:
+    (count,) = LENGTH.unpack_from(data, offset)
+    offset += LENGTH.size
+    values = {}
+    for _ in range(count):
+        key, offset = read_string(data, offset)
+        values[key], offset = read_value(data, offset)
+    return values, offset
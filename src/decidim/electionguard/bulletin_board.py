@@ -1,45 +1,209 @@
 from collections import defaultdict
-from typing import Dict, NoReturn, Optional, Set, Literal, Union, Tuple, List
+from enum import Enum
+from hashlib import sha256
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    NoReturn,
+    Optional,
+    Set,
+    Literal,
+    Union,
+    Tuple,
+    List,
+)
+from jsons import DeserializationError
 from electionguard.ballot import (
     CiphertextBallot,
     from_ciphertext_ballot,
     BallotBoxState,
 )
-from electionguard.ballot_validator import ballot_is_valid_for_election
-from electionguard.decrypt_with_shares import decrypt_selection_with_decryption_shares
+from electionguard.dlog import discrete_log
+from electionguard.election import (
+    CiphertextElectionContext,
+    InternalElectionDescription,
+)
 from electionguard.elgamal import elgamal_combine_public_keys
-from electionguard.group import ElementModP
+from electionguard.decryption_share import CiphertextDecryptionSelection
+from electionguard.group import (
+    ElementModP,
+    ElementModQ,
+    div_p,
+    int_to_q_unchecked,
+    mult_p,
+)
 from electionguard.key_ceremony import PublicKeySet
 from electionguard.tally import (
     CiphertextTally,
-    PlaintextTallySelection,
+    CiphertextTallyContest,
+    CiphertextTallySelection,
 )
-from electionguard.types import CONTEST_ID, GUARDIAN_ID, SELECTION_ID
+from electionguard.types import BALLOT_ID, CONTEST_ID, GUARDIAN_ID, SELECTION_ID
 from electionguard.utils import get_optional
-from .common import Content, Context, ElectionStep, Wrapper
+from pathlib import Path
+from .common import (
+    Content,
+    Context,
+    ElectionStep,
+    Wrapper,
+    check_encoding,
+    message_encoding,
+)
 from .messages import (
-    TrusteePartialKeys,
     TrusteeVerification,
     JointElectionKey,
     TrusteeShare,
+    PartialTally,
 )
 from .utils import (
     InvalidBallot,
+    InvalidPartialTally,
+    InvalidTrusteeShare,
+    JSON_ENCODING,
+    UnsupportedEncoding,
     serialize,
     deserialize,
+    deserialize_ballot,
+    parse_content,
+)
+from .serializable import maybe_base64_to_int
+from .ballot_prescreen import BallotPrescreen
+from .batch_verifier import (
+    BATCH_VERIFICATION_SIZE,
+    ballots_are_valid_for_election,
+    share_is_valid,
 )
-from .dummy_scheduler import DummyScheduler
+from .dlog_table import DiscreteLogPrecomputation, DiscreteLogTable
+from .dummy_scheduler import DummyScheduler, Scheduler
+import logging as log
+
+
+class BallotStatus(Enum):
+    NEW = "new"
+    DUPLICATE = "duplicate"
+    CONFLICT = "conflict"
+
+
+class BallotIndex:
+    """
+    Ids, crypto hashes and content digests of the accepted ballots, so replayed
+    ballots can be found before running any proof verification. Only an exact
+    copy of an accepted ballot is a duplicate, any other content reusing its id
+    or crypto hash is a conflict.
+    """
+
+    hashes: Dict[BALLOT_ID, ElementModQ]
+    ballot_ids: Dict[ElementModQ, BALLOT_ID]
+    digests: Dict[BALLOT_ID, bytes]
+
+    def __init__(self) -> None:
+        self.hashes = {}
+        self.ballot_ids = {}
+        self.digests = {}
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def status(
+        self,
+        ballot_id: BALLOT_ID,
+        crypto_hash: ElementModQ,
+        digest: Optional[bytes] = None,
+    ) -> BallotStatus:
+        if ballot_id in self.hashes:
+            if (
+                digest is not None
+                and self.digests.get(ballot_id) == digest
+                and self.hashes[ballot_id] == crypto_hash
+            ):
+                return BallotStatus.DUPLICATE
+            return BallotStatus.CONFLICT
+
+        if crypto_hash in self.ballot_ids:
+            return BallotStatus.CONFLICT
+
+        return BallotStatus.NEW
+
+    def add(
+        self,
+        ballot_id: BALLOT_ID,
+        crypto_hash: ElementModQ,
+        digest: Optional[bytes] = None,
+    ) -> None:
+        self.hashes[ballot_id] = crypto_hash
+        self.ballot_ids[crypto_hash] = ballot_id
+        if digest is not None:
+            self.digests[ballot_id] = digest
+
+
+def parse_ballot(message: Content) -> Any:
+    try:
+        message_encoding(message)
+        return parse_content(message["content"])
+    except (ValueError, TypeError, UnsupportedEncoding):
+        return None
+
+
+def ballot_index_key(ballot: Any) -> Optional[Tuple[BALLOT_ID, ElementModQ]]:
+    """Reads the ballot id and crypto hash from a parsed ballot"""
+    try:
+        return (
+            ballot["object_id"],
+            int_to_q_unchecked(maybe_base64_to_int(ballot["crypto_hash"])),
+        )
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+def content_digest(content: Union[str, bytes]) -> bytes:
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return sha256(content).digest()
 
 
 class BulletinBoardContext(Context):
     public_keys: Dict[GUARDIAN_ID, ElementModP]
     tally: CiphertextTally
     shares: Dict[GUARDIAN_ID, Dict]
+    dlog_table: Optional[DiscreteLogTable]
+    precompute_dlog: bool
+    dlog_precomputation: Optional[DiscreteLogPrecomputation]
+    ballot_index: BallotIndex
+    ballot_prescreen: BallotPrescreen
 
     def __init__(self):
         self.public_keys = {}
         self.has_joint_key = False
         self.shares = {}
+        self.ballot_index = BallotIndex()
+        self.dlog_table = None
+        self.precompute_dlog = False
+        self.dlog_precomputation = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # threads can't be pickled, the precomputation restarts with the next ballot
+        state["dlog_precomputation"] = None
+        return state
+
+    def request_dlog_precomputation(self) -> None:
+        """Warms up the discrete log table for the number of ballots in the tally"""
+        if not self.precompute_dlog:
+            return
+
+        if not self.dlog_precomputation:
+            self.dlog_precomputation = DiscreteLogPrecomputation(self.dlog_table)
+            self.dlog_precomputation.start()
+
+        self.dlog_precomputation.request(len(self.ballot_index))
+
+    def stop_dlog_precomputation(self) -> None:
+        if self.dlog_precomputation:
+            self.dlog_precomputation.stop()
+            self.dlog_precomputation = None
+            # reopen the table with its final size
+            self.dlog_table.close()
 
 
 class ProcessCreateElection(ElectionStep):
@@ -102,8 +266,8 @@ class ProcessTrusteeElectionPartialKeys(ElectionStep):
         message: Content,
         context: BulletinBoardContext,
     ) -> Tuple[List[Content], Optional[ElectionStep]]:
-        content = deserialize(message["content"], TrusteePartialKeys)
-        self.partial_keys_received.add(content.guardian_id)
+        # the backups are only read by their designated trustees
+        self.partial_keys_received.add(parse_content(message["content"])["guardian_id"])
         # TO-DO: verify partial keys?
 
         if len(self.partial_keys_received) == context.number_of_guardians:
@@ -135,13 +299,11 @@ class ProcessTrusteeVerification(ElectionStep):
 
         joint_key = elgamal_combine_public_keys(context.public_keys.values())
         context.election_builder.set_public_key(get_optional(joint_key))
-        context.election_metadata, context.election_context = get_optional(
-            context.election_builder.build()
-        )
+        context.build_election_context()
         return [
             {
                 "message_type": "end_key_ceremony",
-                "content": serialize(JointElectionKey(joint_key=joint_key)),
+                "content": context.serialize(JointElectionKey(joint_key=joint_key)),
             }
         ], ProcessStartVote()
 
@@ -155,33 +317,219 @@ class ProcessStartVote(ElectionStep):
         message: dict,
         context: BulletinBoardContext,
     ) -> Tuple[List[Content], ElectionStep]:
+        context.tally = CiphertextTally(
+            "election-results", context.election_metadata, context.election_context
+        )
+        context.ballot_prescreen = BallotPrescreen(context.election_metadata)
+        context.request_dlog_precomputation()
         return [], ProcessCastVote()
 
 
 class ProcessCastVote(ElectionStep):
     def skip_message(self, message_type: str):
-        return message_type != "vote.cast" and message_type != "end_vote"
+        return message_type not in ["vote.cast", "vote.partial_tally", "end_vote"]
 
     def process_message(
         self,
-        message_type: Literal["vote.cast", "end_vote"],
+        message_type: Literal["vote.cast", "vote.partial_tally", "end_vote"],
         message: Union[Content, dict],
         context: BulletinBoardContext,
     ) -> Union[NoReturn, Tuple[List[Content], Optional[ElectionStep]]]:
         if message_type == "end_vote":
-            context.tally = CiphertextTally(
-                "election-results", context.election_metadata, context.election_context
-            )
             return [], ProcessStartTally()
 
-        ballot = deserialize(message["content"], CiphertextBallot)
-        if not ballot_is_valid_for_election(
-            ballot, context.election_metadata, context.election_context
-        ):
-            raise InvalidBallot()
-        else:
+        if message_type == "vote.partial_tally":
+            merge_partial_tally(context, deserialize(message["content"], PartialTally))
+            context.request_dlog_precomputation()
             return [], None
 
+        raw_ballot = parse_ballot(message)
+        key = ballot_index_key(raw_ballot)
+        digest = content_digest(message["content"])
+        status = context.ballot_index.status(*key, digest) if key else BallotStatus.NEW
+        if status == BallotStatus.DUPLICATE:
+            return [], None
+        if status == BallotStatus.CONFLICT:
+            raise InvalidBallot()
+
+        if not context.ballot_prescreen.is_valid(raw_ballot):
+            raise InvalidBallot()
+
+        ballot = deserialize_ballot(
+            raw_ballot, context.election_context.elgamal_public_key
+        )
+        if not ballots_are_valid_for_election(
+            [ballot], context.election_metadata, context.election_context
+        )[0]:
+            raise InvalidBallot()
+
+        accept_ballot(context, ballot, digest)
+        context.request_dlog_precomputation()
+        return [], None
+
+    def process_batch(
+        self, messages: Iterable[Content], context: BulletinBoardContext
+    ) -> List[bool]:
+        messages = list(messages)
+        contents = [message["content"] for message in messages]
+        raw_ballots = [parse_ballot(message) for message in messages]
+        keys = [ballot_index_key(raw_ballot) for raw_ballot in raw_ballots]
+        digests = [content_digest(content) for content in contents]
+        pending = [
+            index
+            for index, key in enumerate(keys)
+            if key
+            and context.ballot_index.status(*key, digests[index]) == BallotStatus.NEW
+            and context.ballot_prescreen.is_valid(raw_ballots[index])
+        ]
+
+        # ballots are verified in chunks, checking all their proofs together
+        chunks: List[List[int]] = []
+        for index in pending:
+            if not chunks or len(chunks[-1]) == BATCH_VERIFICATION_SIZE:
+                chunks.append([])
+            chunks[-1].append(index)
+
+        ballots: List[Optional[CiphertextBallot]] = [None] * len(contents)
+        validated_chunks: List[
+            List[Optional[CiphertextBallot]]
+        ] = context.scheduler.schedule(
+            deserialize_valid_ballots,
+            [
+                (
+                    [contents[index] for index in chunk],
+                    context.election_metadata,
+                    context.election_context,
+                )
+                for chunk in chunks
+            ],
+        )
+        for chunk, validated_ballots in zip(chunks, validated_chunks):
+            for index, ballot in zip(chunk, validated_ballots):
+                ballots[index] = ballot
+
+        # the index is checked again in order, as a batch can repeat ballots
+        results: List[bool] = []
+        for key, digest, ballot in zip(keys, digests, ballots):
+            status = (
+                context.ballot_index.status(*key, digest) if key else BallotStatus.NEW
+            )
+            results.append(
+                status == BallotStatus.DUPLICATE
+                or (
+                    status == BallotStatus.NEW
+                    and ballot is not None
+                    and try_accept_ballot(context, ballot, digest)
+                )
+            )
+        context.request_dlog_precomputation()
+
+        return results
+
+
+def deserialize_valid_ballots(
+    contents: List[str],
+    election_metadata: InternalElectionDescription,
+    election_context: CiphertextElectionContext,
+) -> List[Optional[CiphertextBallot]]:
+    ballots: List[Optional[CiphertextBallot]] = []
+    for content in contents:
+        try:
+            ballots.append(
+                deserialize_ballot(content, election_context.elgamal_public_key)
+            )
+        except (ValueError, DeserializationError):
+            ballots.append(None)
+
+    deserialized = [index for index, ballot in enumerate(ballots) if ballot]
+    results = ballots_are_valid_for_election(
+        [ballots[index] for index in deserialized], election_metadata, election_context
+    )
+    for index, valid in zip(deserialized, results):
+        if not valid:
+            ballots[index] = None
+
+    return ballots
+
+
+def accept_ballot(
+    context: BulletinBoardContext, ballot: CiphertextBallot, digest: bytes
+) -> None:
+    """
+    Homomorphically adds an already validated ballot, not found in the ballot
+    index, to the running tally. The ballot is only recorded as accepted once
+    it is part of the tally.
+    """
+    tally = context.tally
+    ciphertexts = {
+        (contest_id, selection_id): selection.ciphertext
+        for contest_id, contest in tally.cast.items()
+        for selection_id, selection in contest.tally_selections.items()
+    }
+    # `CiphertextTally.append` would validate the ballot again
+    if not tally._add_cast(
+        from_ciphertext_ballot(ballot, BallotBoxState.CAST), DummyScheduler()
+    ):
+        # undo the contests accumulated before the failing one
+        for (contest_id, selection_id), ciphertext in ciphertexts.items():
+            tally.cast[contest_id].tally_selections[
+                selection_id
+            ].ciphertext = ciphertext
+        raise InvalidBallot()
+
+    context.ballot_index.add(ballot.object_id, ballot.crypto_hash, digest)
+
+
+def try_accept_ballot(
+    context: BulletinBoardContext, ballot: CiphertextBallot, digest: bytes
+) -> bool:
+    try:
+        accept_ballot(context, ballot, digest)
+        return True
+    except InvalidBallot:
+        return False
+
+
+def merge_partial_tally(
+    context: BulletinBoardContext, partial_tally: PartialTally
+) -> None:
+    """
+    Homomorphically adds a tally accumulated by another bulletin board for the
+    same election. Both tallies must be built from disjoint sets of ballots.
+    The merged ballots are only recorded in the ballot index, which counts the
+    ballots of the tally from then on.
+    """
+    tally = context.tally
+    if any(
+        context.ballot_index.status(ballot_id, crypto_hash) != BallotStatus.NEW
+        for ballot_id, crypto_hash in partial_tally.ballot_hashes.items()
+    ):
+        raise InvalidPartialTally()
+
+    for contest_id, contest in tally.cast.items():
+        partial_contest = partial_tally.contests.get(contest_id)
+        if (
+            not partial_contest
+            or partial_contest.description_hash != contest.description_hash
+            or partial_contest.tally_selections.keys()
+            != contest.tally_selections.keys()
+        ):
+            raise InvalidPartialTally()
+
+    for contest_id, contest in tally.cast.items():
+        for selection_id, selection in contest.tally_selections.items():
+            selection.elgamal_accumulate(
+                partial_tally.contests[contest_id]
+                .tally_selections[selection_id]
+                .ciphertext
+            )
+
+    for ballot_id, crypto_hash in partial_tally.ballot_hashes.items():
+        digest = partial_tally.ballot_digests.get(ballot_id)
+        context.ballot_index.add(
+            ballot_id, crypto_hash, bytes.fromhex(digest) if digest else None
+        )
+
 
 class ProcessStartTally(ElectionStep):
     message_type = "start_tally"
@@ -202,51 +550,155 @@ class ProcessTrusteeShare(ElectionStep):
         self, message_type: str, message: Content, context: BulletinBoardContext
     ) -> Tuple[List[Content], None]:
         content = deserialize(message["content"], TrusteeShare)
+        if not share_is_valid(
+            content,
+            context.tally.cast,
+            context.election_context.crypto_extended_base_hash,
+        ):
+            raise InvalidTrusteeShare()
         context.shares[content.guardian_id] = content
 
         if len(context.shares) < context.number_of_guardians:
             return [], None
 
-        tally_shares = self._prepare_shares_for_decryption(context.shares)
-        results: Dict[CONTEST_ID, Dict[SELECTION_ID, int]] = {}
-
-        for contest in context.tally.cast.values():
-            results[contest.object_id] = {}
-            for selection in contest.tally_selections.values():
-                selection_results: PlaintextTallySelection = (
-                    decrypt_selection_with_decryption_shares(
-                        selection,
-                        tally_shares[selection.object_id],
-                        context.election_context.crypto_extended_base_hash,
-                    )
-                )
-                results[contest.object_id][
-                    selection.object_id
-                ] = selection_results.tally
+        context.stop_dlog_precomputation()
+        work_units = self._prepare_shares_for_decryption(
+            context.tally.cast, context.shares
+        )
+        tallies: List[int] = context.scheduler.schedule(
+            decrypt_selection_tally,
+            [
+                (selection, selection_shares, context.dlog_table)
+                for (_, selection, selection_shares) in work_units
+            ],
+        )
+
+        # contests without selections are reported too, as empty results
+        results: Dict[CONTEST_ID, Dict[SELECTION_ID, int]] = {
+            contest_id: {} for contest_id in context.tally.cast
+        }
+        for (contest_id, selection, _), tally in zip(work_units, tallies):
+            results[contest_id][selection.object_id] = tally
 
         return [{"message_type": "end_tally", "results": results}], None
 
-    def _prepare_shares_for_decryption(self, tally_shares):
+    def _prepare_shares_for_decryption(
+        self,
+        tally_cast: Dict[CONTEST_ID, CiphertextTallyContest],
+        tally_shares: Dict[GUARDIAN_ID, TrusteeShare],
+    ) -> List[
+        Tuple[
+            CONTEST_ID,
+            CiphertextTallySelection,
+            Dict[GUARDIAN_ID, Tuple[ElementModP, CiphertextDecryptionSelection]],
+        ]
+    ]:
         shares = defaultdict(dict)
         for guardian_id, share in tally_shares.items():
             for question_id, question in share.contests.items():
                 for selection_id, selection in question.selections.items():
                     shares[selection_id][guardian_id] = (share.public_key, selection)
-        return shares
+
+        return [
+            (contest.object_id, selection, shares[selection.object_id])
+            for contest in tally_cast.values()
+            for selection in contest.tally_selections.values()
+        ]
+
+
+def decrypt_selection_tally(
+    selection: CiphertextTallySelection,
+    shares: Dict[GUARDIAN_ID, Tuple[ElementModP, CiphertextDecryptionSelection]],
+    dlog_table: Optional[DiscreteLogTable] = None,
+) -> int:
+    # same as `decrypt_selection_with_decryption_shares`, using the table when
+    # available. The shares were verified when they were received.
+    decrypted_value = div_p(
+        selection.ciphertext.data,
+        mult_p(*[decryption.share for (_, decryption) in shares.values()]),
+    )
+
+    if dlog_table:
+        return dlog_table.discrete_log(decrypted_value)
+    return discrete_log(decrypted_value)
 
 
 class BulletinBoard(Wrapper[BulletinBoardContext]):
-    def __init__(self, recorder=None) -> None:
+    def __init__(
+        self,
+        recorder=None,
+        scheduler: Optional[Scheduler] = None,
+        dlog_table_path: Optional[Path] = None,
+        precompute_dlog: bool = False,
+        encoding: str = JSON_ENCODING,
+    ) -> None:
+        """
+        The messages published by the bulletin board for every participant are
+        written with the given `encoding`.
+        """
         super().__init__(
             BulletinBoardContext(), ProcessCreateElection(), recorder=recorder
         )
+        self.context.scheduler = scheduler or DummyScheduler()
+        self.context.encoding = check_encoding(encoding)
+        if precompute_dlog and not dlog_table_path:
+            dlog_table_path = DiscreteLogTable.path_for(
+                DiscreteLogTable.cache_directory()
+            )
+        if dlog_table_path:
+            self.context.dlog_table = DiscreteLogTable(dlog_table_path)
+        self.context.precompute_dlog = precompute_dlog
+
+    def cast_ballots(self, messages: Iterable[Content]) -> List[bool]:
+        """
+        Validates a batch of `vote.cast` messages on the worker pool.
+        Returns whether each ballot was accepted, in the same order. Outside
+        the vote every ballot is rejected.
+        """
+        if not isinstance(self.step, ProcessCastVote):
+            log.warning(f"{self.__class__.__name__} skipping batch of `vote.cast`")
+            return [False for _ in messages]
+
+        return self.step.process_batch(messages, self.context)
+
+    def add_ballot(self, ballot: Union[str, bytes, dict]) -> bool:
+        """
+        Validates a ballot and adds it to the tally. Ballots accepted through
+        `vote.cast` or merged from a partial tally are already part of the tally
+        and are ignored. Returns whether the ballot was added.
+        """
+        ciphertext_ballot = deserialize_ballot(
+            ballot, self.context.election_context.elgamal_public_key
+        )
+        key = (ciphertext_ballot.object_id, ciphertext_ballot.crypto_hash)
+        if self.context.ballot_index.status(*key) != BallotStatus.NEW:
+            return False
 
-    def add_ballot(self, ballot: dict):
-        ciphertext_ballot = deserialize(ballot, CiphertextBallot)
-        self.context.tally.append(
+        # a single ballot isn't worth sending to the worker pool
+        if not self.context.tally.append(
             from_ciphertext_ballot(ciphertext_ballot, BallotBoxState.CAST),
             DummyScheduler(),
-        )
+        ):
+            return False
+
+        digest = None if isinstance(ballot, dict) else content_digest(ballot)
+        self.context.ballot_index.add(*key, digest)
+        return True
+
+    def get_partial_tally(self) -> Dict:
+        return {
+            "message_type": "vote.partial_tally",
+            "content": serialize(
+                PartialTally(
+                    ballot_hashes=self.context.ballot_index.hashes,
+                    contests=self.context.tally.cast,
+                    ballot_digests={
+                        ballot_id: digest.hex()
+                        for ballot_id, digest in self.context.ballot_index.digests.items()
+                    },
+                )
+            ),
+        }
 
     def get_tally_cast(self) -> Dict:
         return {
@@ -1,5 +1,10 @@
+from base64 import b64encode
+from collections import OrderedDict
+from copy import copy
 from dataclasses import dataclass
+from hashlib import sha256
 import json
+from threading import Lock
 import time
 from pathlib import Path
 from electionguard.election import (
@@ -9,9 +14,31 @@ from electionguard.election import (
     InternalElectionDescription,
 )
 from electionguard.election_builder import ElectionBuilder
-from typing import Generic, List, Optional, Tuple, TypeVar, TypedDict
+from typing import (
+    Callable,
+    Generic,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    TypedDict,
+    Union,
+)
 import logging as log
-from .utils import complete_election_description, InvalidElectionDescription
+from electionguard.utils import get_optional
+from .dummy_scheduler import DummyScheduler, Scheduler
+from .fixed_base import register_fixed_bases
+from .utils import (
+    BINARY_ENCODING,
+    complete_election_description,
+    content_encoding,
+    ENCODINGS,
+    InvalidElectionDescription,
+    JSON_ENCODING,
+    serialize_content,
+    UnsupportedEncoding,
+)
 
 try:
     import cPickle as pickle
@@ -19,27 +46,125 @@ except:  # noqa: E722
     import pickle
 
 
+T = TypeVar("T")
+
+# Elections kept by the process-wide election caches
+ELECTION_CACHE_SIZE = 32
+
+
+class LRUCache(Generic[T]):
+    """Thread-safe mapping that keeps only the `maxsize` most recently used items"""
+
+    maxsize: int
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._items: OrderedDict = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get_or_build(self, key: Hashable, build: Callable[[], T]) -> T:
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+
+        # built outside the lock, so a slow election doesn't block the others
+        value = build()
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+# Wrappers of the same election share these immutable objects
+election_builders: LRUCache[ElectionBuilder] = LRUCache(ELECTION_CACHE_SIZE)
+election_contexts: LRUCache[
+    Tuple[InternalElectionDescription, CiphertextElectionContext]
+] = LRUCache(ELECTION_CACHE_SIZE)
+
+
+def election_digest(election_creation: dict) -> str:
+    return sha256(
+        json.dumps(election_creation, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def build_election_builder(election_creation: dict) -> ElectionBuilder:
+    election = ElectionDescription.from_json_object(
+        complete_election_description(election_creation["description"])
+    )
+
+    if not election.is_valid():
+        raise InvalidElectionDescription()
+
+    return ElectionBuilder(
+        len(election_creation["trustees"]),
+        election_creation["scheme"]["quorum"],
+        election,
+    )
+
+
 class Context:
     election: ElectionDescription
     election_builder: ElectionBuilder
     election_metadata: InternalElectionDescription
     election_context: CiphertextElectionContext
+    election_digest: Optional[str] = None
     number_of_guardians: int
     quorum: int
+    scheduler: Scheduler = DummyScheduler()
+    # configured encoding of the messages sent to every participant
+    encoding: str = JSON_ENCODING
+    # encoding of the message being processed, used for the direct replies
+    reply_encoding: str = JSON_ENCODING
 
-    def build_election(self, election_creation: dict):
-        self.election = ElectionDescription.from_json_object(
-            complete_election_description(election_creation["description"])
-        )
+    def serialize(self, obj) -> Union[str, bytes]:
+        return serialize_content(obj, self.encoding)
 
-        if not self.election.is_valid():
-            raise InvalidElectionDescription()
+    def serialize_reply(self, obj) -> Union[str, bytes]:
+        return serialize_content(obj, self.reply_encoding)
 
-        self.number_of_guardians = len(election_creation["trustees"])
-        self.quorum = election_creation["scheme"]["quorum"]
-        self.election_builder = ElectionBuilder(
-            self.number_of_guardians, self.quorum, self.election
+    def build_election(self, election_creation: dict):
+        self.election_digest = election_digest(election_creation)
+        # the cached builder is copied, as the joint key is set on it later
+        self.election_builder = copy(
+            election_builders.get_or_build(
+                self.election_digest,
+                lambda: build_election_builder(election_creation),
+            )
         )
+        self.election = self.election_builder.description
+        self.number_of_guardians = self.election_builder.number_of_guardians
+        self.quorum = self.election_builder.quorum
+
+    def build_election_context(self):
+        def build():
+            return get_optional(self.election_builder.build())
+
+        if self.election_digest is None:
+            self.election_metadata, self.election_context = build()
+        else:
+            joint_key = get_optional(self.election_builder.elgamal_public_key)
+            (
+                self.election_metadata,
+                self.election_context,
+            ) = election_contexts.get_or_build((self.election_digest, joint_key), build)
+        register_fixed_bases(self.election_context.elgamal_public_key)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # fixed-base tables live in the process, build them again when restoring
+        if "election_context" in state:
+            register_fixed_bases(self.election_context.elgamal_public_key)
 
 
 C = TypeVar("C", bound=Context)
@@ -50,6 +175,32 @@ class Content(TypedDict):
     content: object
 
 
+def check_encoding(encoding: str) -> str:
+    if encoding not in ENCODINGS:
+        raise UnsupportedEncoding(encoding)
+    return encoding
+
+
+def message_encoding(message: Optional[Content]) -> str:
+    """Declared encoding of a message, which must match its content"""
+    if not isinstance(message, dict) or "encoding" not in message:
+        return JSON_ENCODING
+
+    encoding = check_encoding(message["encoding"])
+    content = message.get("content")
+    if content is not None and content_encoding(content) != encoding:
+        raise UnsupportedEncoding(
+            f"{content_encoding(content)} content declared as {encoding}"
+        )
+    return encoding
+
+
+def encode_bytes(value):
+    if isinstance(value, (bytes, bytearray)):
+        return b64encode(value).decode("utf-8")
+    raise TypeError(f"{value.__class__.__name__} is not JSON serializable")
+
+
 class ElectionStep(Generic[C]):
     message_type: str
 
@@ -94,6 +245,7 @@ class Recorder:
                 "out": result,
             },
             self.file,
+            default=encode_bytes,
         )
         self.file.write("\n")
 
@@ -114,9 +266,13 @@ class Wrapper(Generic[C]):
             log.warning(f"{self.__class__.__name__} skipping message `{message_type}`")
             return []
 
+        self.context.reply_encoding = message_encoding(message)
         results, next_step = self.step.process_message(
             message_type, message, self.context
         )
+        for result in results:
+            if isinstance(result.get("content"), bytes):
+                result["encoding"] = BINARY_ENCODING
 
         if self.recorder:
             for result in results:
@@ -142,6 +298,8 @@ class Wrapper(Generic[C]):
         raise NotImplementedError
 
     def backup(self) -> str:
+        # worker pools can't be pickled, they are reopened when needed
+        self.context.scheduler.close()
         return pickle.dumps(self)
 
     def restore(backup: str):  # returns an instance of myself
@@ -0,0 +1,155 @@
+"""
+Compact ballots leave out the commitments of their proofs, which the verifier
+computes back from the ciphertexts, challenges and responses with the joint key:
+
+    a0 = g^v0 · α^-c0           b0 = K^v0 · β^-c0
+    a1 = g^v1 · α^-c1           b1 = g^c1 · K^v1 · β^-c1
+    a  = g^v · A^-c             b  = g^(c·L) · K^v · B^-c
+
+The challenges are still checked against the hash of the restored commitments,
+so a compact ballot is only valid if its complete version is.
+"""
+
+from typing import Any, Dict, List, Tuple
+from electionguard.group import ElementModP, P, Q
+from gmpy2 import mpz, powmod
+from .fixed_base import g_pow_p, pow_p
+from .serializable import maybe_base64_to_int
+
+COMPACT_KEY = "compact"
+DISJUNCTIVE_COMMITMENTS = [
+    "proof_zero_pad",
+    "proof_zero_data",
+    "proof_one_pad",
+    "proof_one_data",
+]
+CONSTANT_COMMITMENTS = ["pad", "data"]
+
+
+def is_compact(ballot: Any) -> bool:
+    return isinstance(ballot, dict) and ballot.get(COMPACT_KEY) is True
+
+
+def compact_ballot(ballot: dict) -> dict:
+    """Removes the proof commitments from an encoded ballot"""
+    return {
+        **ballot,
+        COMPACT_KEY: True,
+        "contests": [
+            {
+                **contest,
+                "ballot_selections": [
+                    {
+                        **selection,
+                        "proof": without_keys(
+                            selection["proof"], DISJUNCTIVE_COMMITMENTS
+                        ),
+                    }
+                    for selection in contest["ballot_selections"]
+                ],
+                "proof": without_keys(contest["proof"], CONSTANT_COMMITMENTS),
+            }
+            for contest in ballot["contests"]
+        ],
+    }
+
+
+def expand_ballot(ballot: dict, public_key: ElementModP) -> dict:
+    """Restores the proof commitments of a parsed compact ballot"""
+    expanded = {
+        **ballot,
+        "contests": [
+            expand_contest(contest, public_key) for contest in ballot["contests"]
+        ],
+    }
+    del expanded[COMPACT_KEY]
+    return expanded
+
+
+def expand_contest(contest: dict, public_key: ElementModP) -> dict:
+    selections = []
+    accumulation = (mpz(1), mpz(1))
+    for selection in contest["ballot_selections"]:
+        alpha, beta = ciphertext_values(selection["ciphertext"])
+        accumulation = (accumulation[0] * alpha % P, accumulation[1] * beta % P)
+        selections.append(
+            {
+                **selection,
+                "proof": {
+                    **selection["proof"],
+                    **disjunctive_commitments(
+                        selection["proof"], (alpha, beta), public_key
+                    ),
+                },
+            }
+        )
+
+    return {
+        **contest,
+        "ballot_selections": selections,
+        "proof": {
+            **contest["proof"],
+            **constant_commitments(contest["proof"], accumulation, public_key),
+        },
+    }
+
+
+def disjunctive_commitments(
+    proof: dict, message: Tuple[mpz, mpz], public_key: ElementModP
+) -> Dict[str, int]:
+    (alpha, beta) = message
+    c0, c1, v0, v1 = element_values(
+        proof,
+        [
+            "proof_zero_challenge",
+            "proof_one_challenge",
+            "proof_zero_response",
+            "proof_one_response",
+        ],
+    )
+    return {
+        "proof_zero_pad": int(g_pow(v0) * powmod(alpha, -c0 % Q, P) % P),
+        "proof_zero_data": int(key_pow(public_key, v0) * powmod(beta, -c0 % Q, P) % P),
+        "proof_one_pad": int(g_pow(v1) * powmod(alpha, -c1 % Q, P) % P),
+        "proof_one_data": int(
+            g_pow(c1) * key_pow(public_key, v1) % P * powmod(beta, -c1 % Q, P) % P
+        ),
+    }
+
+
+def constant_commitments(
+    proof: dict, message: Tuple[mpz, mpz], public_key: ElementModP
+) -> Dict[str, int]:
+    (alpha, beta) = message
+    c, v, constant = element_values(proof, ["challenge", "response", "constant"])
+    return {
+        "pad": int(g_pow(v) * powmod(alpha, -c % Q, P) % P),
+        "data": int(
+            g_pow(c * constant % Q)
+            * key_pow(public_key, v)
+            % P
+            * powmod(beta, -c % Q, P)
+            % P
+        ),
+    }
+
+
+def ciphertext_values(ciphertext: dict) -> Tuple[mpz, mpz]:
+    pad, data = element_values(ciphertext, ["pad", "data"])
+    return (mpz(pad), mpz(data))
+
+
+def element_values(values: dict, keys: List[str]) -> List[int]:
+    return [maybe_base64_to_int(values[key]) for key in keys]
+
+
+def g_pow(exponent: int) -> mpz:
+    return g_pow_p(exponent).elem
+
+
+def key_pow(public_key: ElementModP, exponent: int) -> mpz:
+    return pow_p(public_key, exponent).elem
+
+
+def without_keys(values: dict, keys: List[str]) -> dict:
+    return {key: value for key, value in values.items() if key not in keys}
@@ -0,0 +1,229 @@
+from hashlib import sha256
+from mmap import mmap, ACCESS_READ
+from pathlib import Path
+from struct import Struct
+from tempfile import mkstemp
+from threading import Condition, Thread
+from typing import Optional
+import os
+from electionguard.dlog import discrete_log
+from electionguard.group import ElementModP, G, P, g_pow_p, int_to_q_unchecked
+from gmpy2 import mpz
+from .utils import InvalidDiscreteLogTable
+
+MAGIC = b"EGDLOG1\0"
+HEADER = Struct(">8s32sQ")  # magic, group digest, number of records
+RECORD = Struct(">QI")  # low 64 bits of g^m, m
+KEY_MASK = (1 << 64) - 1
+
+
+def group_digest() -> bytes:
+    return sha256(f"{P}|{G}".encode("utf-8")).digest()
+
+
+class DiscreteLogTable:
+    """
+    Precomputed g^m -> m lookup table for every m up to `max_exponent`, stored
+    in a file as records sorted by the lowest 64 bits of g^m and memory-mapped
+    on the first lookup. Elements out of the table fall back to electionguard's
+    linear search.
+    """
+
+    path: Path
+    max_exponent: Optional[int]
+
+    _file = None
+    _mmap: Optional[mmap] = None
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.max_exponent = None
+
+    @staticmethod
+    def path_for(directory: Path) -> Path:
+        """Tables only depend on the group parameters and can be shared by elections"""
+        return Path(directory) / f"dlog-{group_digest().hex()[:16]}.bin"
+
+    @staticmethod
+    def cache_directory() -> Path:
+        """Per-user directory for the tables, created when missing"""
+        directory = (
+            Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+            / "decidim-electionguard"
+        )
+        directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        return directory
+
+    @classmethod
+    def precompute(cls, path: Path, max_exponent: int) -> "DiscreteLogTable":
+        table = cls(path)
+        table.extend(max_exponent)
+        return table
+
+    def extend(self, max_exponent: int) -> None:
+        """Makes sure the table covers every exponent up to `max_exponent`"""
+        try:
+            if self.load() and self.max_exponent >= max_exponent:
+                return
+        except InvalidDiscreteLogTable:
+            pass
+
+        records = []
+        first_exponent = 0
+        if self._mmap is not None:
+            first_exponent = self.max_exponent + 1
+            self._mmap.seek(HEADER.size)
+            records = [
+                RECORD.pack(*record) for record in RECORD.iter_unpack(self._mmap.read())
+            ]
+        self.close()
+
+        g = mpz(G)
+        element = g_pow_p(int_to_q_unchecked(first_exponent)).to_int()
+        for exponent in range(first_exponent, max_exponent + 1):
+            records.append(RECORD.pack(int(element & KEY_MASK), exponent))
+            element = element * g % P
+        records.sort()
+
+        # every extension writes its own file, so concurrent writers never
+        # replace the table with a partially written one
+        descriptor, partial_path = mkstemp(
+            dir=self.path.parent, prefix=f"{self.path.name}.", suffix=".partial"
+        )
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(HEADER.pack(MAGIC, group_digest(), len(records)))
+                file.writelines(records)
+            os.replace(partial_path, self.path)
+        except BaseException:
+            os.unlink(partial_path)
+            raise
+
+        self.max_exponent = max_exponent
+
+    def load(self) -> bool:
+        if self._mmap is not None:
+            return True
+
+        try:
+            self._file = open(self.path, "rb")
+            self._mmap = mmap(self._file.fileno(), 0, access=ACCESS_READ)
+        except (OSError, ValueError):
+            self.close()
+            return False
+
+        if len(self._mmap) < HEADER.size:
+            self.close()
+            raise InvalidDiscreteLogTable()
+
+        magic, digest, count = HEADER.unpack_from(self._mmap, 0)
+        if (
+            magic != MAGIC
+            or digest != group_digest()
+            or len(self._mmap) != HEADER.size + count * RECORD.size
+        ):
+            self.close()
+            raise InvalidDiscreteLogTable()
+
+        self.max_exponent = count - 1
+        return True
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+        if self._file is not None:
+            self._file.close()
+        self._mmap = None
+        self._file = None
+
+    def discrete_log(self, element: ElementModP) -> int:
+        exponent = self.lookup(element)
+        if exponent is None:
+            return discrete_log(element)
+        return exponent
+
+    def lookup(self, element: ElementModP) -> Optional[int]:
+        if not self.load():
+            return None
+
+        key = int(element.to_int() & KEY_MASK)
+        count = self.max_exponent + 1
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if self._record(middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        # different elements could share the same key
+        while low < count:
+            record_key, exponent = self._record(low)
+            if record_key != key:
+                break
+            if g_pow_p(int_to_q_unchecked(exponent)) == element:
+                return exponent
+            low += 1
+
+        return None
+
+    def _record(self, index: int):
+        return RECORD.unpack_from(self._mmap, HEADER.size + index * RECORD.size)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_file", None)
+        state.pop("_mmap", None)
+        return state
+
+
+class DiscreteLogPrecomputation(Thread):
+    """
+    Background worker that extends a `DiscreteLogTable` as the expected
+    maximum exponent grows, doubling its size to avoid rebuilding it too often.
+    """
+
+    MINIMUM_SIZE = 1_000
+
+    table: DiscreteLogTable
+
+    _condition: Condition
+    _requested: int
+    _stopped: bool
+
+    def __init__(self, table: DiscreteLogTable) -> None:
+        super().__init__(daemon=True)
+        self.table = table
+        self._condition = Condition()
+        self._requested = 0
+        self._stopped = False
+
+    def request(self, max_exponent: int) -> None:
+        with self._condition:
+            if max_exponent > self._requested:
+                self._requested = max_exponent
+                self._condition.notify()
+
+    def stop(self) -> None:
+        """Waits until the requested size is built and stops the worker"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self.join()
+
+    def run(self) -> None:
+        built = -1
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._stopped or self._requested > built
+                )
+                if self._requested <= built:
+                    return
+                size = max(self._requested, 2 * built, self.MINIMUM_SIZE)
+
+            # a separate instance so readers of `table` are not disturbed
+            table = DiscreteLogTable(self.table.path)
+            table.extend(size)
+            table.close()
+            built = table.max_exponent
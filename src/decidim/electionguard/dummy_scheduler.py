@@ -1,9 +1,39 @@
-from typing import Any, Callable, Iterable, List, TypeVar
-from itertools import starmap
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import partial
+from itertools import islice
+from multiprocessing import Pool as ProcessPool
+from multiprocessing.dummy import Pool as ThreadPool
+from multiprocessing.pool import Pool
+from multiprocessing.shared_memory import SharedMemory
+from os import cpu_count
+from queue import SimpleQueue
+import pickle
 from electionguard.singleton import Singleton
 
 _T = TypeVar("_T")
 
+# Every worker receives this many chunks of tasks on average
+CHUNKS_PER_WORKER = 4
+
+# Tasks per chunk of a stream of unknown length
+STREAM_CHUNKSIZE = 4
+
+# Shared arguments kept by every worker process, by name of their shared memory
+WORKER_SHARED_ARGUMENTS = 4
+_worker_shared_arguments: OrderedDict = OrderedDict()
+
 
 class DummyScheduler(Singleton):
     def schedule(
@@ -11,5 +41,235 @@ class DummyScheduler(Singleton):
         task: Callable,
         arguments: Iterable[Iterable[Any]],
         with_shared_resources: bool = False,
+        shared_arguments: Tuple = (),
+    ) -> List[_T]:
+        return [
+            task(*shared_arguments, *task_arguments) for task_arguments in arguments
+        ]
+
+    def schedule_unordered(
+        self,
+        task: Callable,
+        arguments: Iterable[Iterable[Any]],
+        with_shared_resources: bool = False,
+        shared_arguments: Tuple = (),
+    ) -> Iterator[_T]:
+        return (
+            task(*shared_arguments, *task_arguments) for task_arguments in arguments
+        )
+
+    def close(self) -> None:
+        pass
+
+
+class PoolScheduler:
+    """
+    Scheduler backed by a pool of worker processes (or threads, when the tasks
+    need to share resources), with the same interface as `DummyScheduler`.
+
+    Pools are created lazily on the first scheduled task, reused by the next
+    ones until the scheduler is closed, and are never pickled, so wrappers
+    holding a scheduler can still be backed up and restored.
+
+    Tasks receive the `shared_arguments` before the arguments of each task.
+    With processes, they are pickled once per call into shared memory, and
+    every worker loads them once instead of receiving them with every task.
+    """
+
+    max_workers: int
+    use_processes: bool
+    chunksize: Optional[int]
+
+    _process_pool: Optional[Pool]
+    _thread_pool: Optional[Pool]
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        use_processes: bool = True,
+        chunksize: Optional[int] = None,
+    ) -> None:
+        self.max_workers = max_workers or cpu_count() or 1
+        self.use_processes = use_processes
+        self.chunksize = chunksize
+        self._process_pool = None
+        self._thread_pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_process_pool"] = None
+        state["_thread_pool"] = None
+        return state
+
+    def schedule(
+        self,
+        task: Callable,
+        arguments: Iterable[Iterable[Any]],
+        with_shared_resources: bool = False,
+        shared_arguments: Tuple = (),
     ) -> List[_T]:
-        return list(starmap(task, arguments))
+        arguments = list(arguments)
+        if len(arguments) <= 1 or self.max_workers == 1:
+            return DummyScheduler().schedule(task, arguments, False, shared_arguments)
+
+        pool = self._get_pool(with_shared_resources)
+        with self._pool_task(task, with_shared_resources, shared_arguments) as task:
+            return pool.starmap(task, arguments, self._chunksize_for(len(arguments)))
+
+    def schedule_unordered(
+        self,
+        task: Callable,
+        arguments: Iterable[Iterable[Any]],
+        with_shared_resources: bool = False,
+        shared_arguments: Tuple = (),
+    ) -> Iterator[_T]:
+        """
+        Yields the results as soon as they are completed, in any order. Arguments
+        can be a lazy stream: they are read while the results are consumed, with
+        at most `CHUNKS_PER_WORKER` chunks of tasks per worker in flight.
+        """
+        if self.max_workers == 1:
+            return DummyScheduler().schedule_unordered(
+                task, arguments, False, shared_arguments
+            )
+
+        return self._stream(
+            task, iter(arguments), with_shared_resources, shared_arguments
+        )
+
+    def close(self) -> None:
+        for pool in (self._process_pool, self._thread_pool):
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        self._process_pool = None
+        self._thread_pool = None
+
+    def _stream(
+        self,
+        task: Callable,
+        arguments: Iterator[Iterable[Any]],
+        with_shared_resources: bool,
+        shared_arguments: Tuple,
+    ) -> Iterator[_T]:
+        chunks = iter(
+            lambda: list(islice(arguments, self.chunksize or STREAM_CHUNKSIZE)), []
+        )
+        max_in_flight = self.max_workers * CHUNKS_PER_WORKER
+
+        pool = self._get_pool(with_shared_resources)
+        with self._pool_task(task, with_shared_resources, shared_arguments) as task:
+            yield from apply_bounded(pool, task, chunks, max_in_flight)
+
+    @contextmanager
+    def _pool_task(
+        self, task: Callable, with_shared_resources: bool, shared_arguments: Tuple
+    ) -> Iterator[Callable]:
+        if not shared_arguments or not self._uses_processes(with_shared_resources):
+            yield partial(task, *shared_arguments)
+            return
+
+        data = pickle.dumps(shared_arguments, pickle.HIGHEST_PROTOCOL)
+        memory = SharedMemory(create=True, size=len(data))
+        try:
+            memory.buf[: len(data)] = data
+            yield SharedArgumentsTask(task, memory.name, len(data))
+        finally:
+            memory.close()
+            memory.unlink()
+
+    def _uses_processes(self, with_shared_resources: bool) -> bool:
+        return self.use_processes and not with_shared_resources
+
+    def _get_pool(self, with_shared_resources: bool) -> Pool:
+        if not self._uses_processes(with_shared_resources):
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPool(self.max_workers)
+            return self._thread_pool
+
+        if self._process_pool is None:
+            self._process_pool = ProcessPool(self.max_workers)
+        return self._process_pool
+
+    def _chunksize_for(self, number_of_tasks: int) -> int:
+        if self.chunksize:
+            return self.chunksize
+
+        return max(1, -(-number_of_tasks // (self.max_workers * CHUNKS_PER_WORKER)))
+
+
+class SharedArgumentsTask:
+    """Task called with the shared arguments stored in a shared memory block"""
+
+    def __init__(self, task: Callable, name: str, size: int) -> None:
+        self.task = task
+        self.name = name
+        self.size = size
+
+    def __call__(self, *arguments: Any) -> Any:
+        return self.task(*self.shared_arguments(), *arguments)
+
+    def shared_arguments(self) -> Tuple:
+        if self.name in _worker_shared_arguments:
+            _worker_shared_arguments.move_to_end(self.name)
+            return _worker_shared_arguments[self.name]
+
+        memory = SharedMemory(self.name)
+        try:
+            shared_arguments = pickle.loads(memory.buf[: self.size].tobytes())
+        finally:
+            memory.close()
+
+        _worker_shared_arguments[self.name] = shared_arguments
+        while len(_worker_shared_arguments) > WORKER_SHARED_ARGUMENTS:
+            _worker_shared_arguments.popitem(last=False)
+        return shared_arguments
+
+
+def apply_chunk(task: Callable, chunk: List[Iterable[Any]]) -> List[Any]:
+    return [task(*arguments) for arguments in chunk]
+
+
+def apply_bounded(
+    pool: Pool,
+    task: Callable,
+    chunks: Iterator[List[Iterable[Any]]],
+    max_in_flight: int,
+) -> Iterator[Any]:
+    """
+    Same as `Pool.imap_unordered` with chunks, reading the next chunks only as
+    the previous ones are completed.
+    """
+    completed: SimpleQueue = SimpleQueue()
+    in_flight = 0
+    for chunk in chunks:
+        pool.apply_async(
+            apply_chunk,
+            (task, chunk),
+            callback=lambda results: completed.put((True, results)),
+            error_callback=lambda error: completed.put((False, error)),
+        )
+        in_flight += 1
+        if in_flight == max_in_flight:
+            yield from completed_results(completed)
+            in_flight -= 1
+
+    for _ in range(in_flight):
+        yield from completed_results(completed)
+
+
+def completed_results(completed: SimpleQueue) -> List[Any]:
+    succeeded, results = completed.get()
+    if not succeeded:
+        raise results
+    return results
+
+
+Scheduler = Union[DummyScheduler, PoolScheduler]
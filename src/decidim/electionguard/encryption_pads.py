@@ -0,0 +1,395 @@
+from collections import deque
+from threading import Condition, Thread
+from typing import Deque, List, NamedTuple, Optional, Tuple
+from electionguard.ballot import (
+    CiphertextBallot,
+    CiphertextBallotContest,
+    CiphertextBallotSelection,
+    PlaintextBallot,
+    make_ciphertext_ballot,
+    make_ciphertext_ballot_contest,
+    make_ciphertext_ballot_selection,
+)
+from electionguard.chaum_pedersen import (
+    ConstantChaumPedersenProof,
+    DisjunctiveChaumPedersenProof,
+)
+from electionguard.election import (
+    CiphertextElectionContext,
+    ContestDescriptionWithPlaceholders,
+    InternalElectionDescription,
+    SelectionDescription,
+)
+from electionguard.elgamal import ElGamalCiphertext, elgamal_add
+from electionguard.group import (
+    ElementModP,
+    ElementModQ,
+    G,
+    ZERO_MOD_Q,
+    a_minus_b_q,
+    a_plus_bc_q,
+    add_q,
+    mult_p,
+    negate_q,
+    rand_q,
+)
+from electionguard.hash import hash_elems
+import logging as log
+from .batch_verifier import ballots_are_valid_for_election
+from .fixed_base import g_pow_p, pow_p
+
+
+class DisjunctiveCommitments(NamedTuple):
+    """
+    Commitments of a disjunctive proof for a known plaintext: the secret of
+    the real branch and the challenge and response of the simulated one.
+    """
+
+    secret: ElementModQ
+    challenge: ElementModQ
+    response: ElementModQ
+    proof_zero_pad: ElementModP
+    proof_zero_data: ElementModP
+    proof_one_pad: ElementModP
+    proof_one_data: ElementModP
+
+
+class SelectionPad(NamedTuple):
+    nonce: ElementModQ
+    pad: ElementModP  # g^r
+    key_power: ElementModP  # K^r
+    commitments: Tuple[DisjunctiveCommitments, DisjunctiveCommitments]
+
+
+class ContestPad(NamedTuple):
+    secret: ElementModQ
+    pad: ElementModP
+    data: ElementModP
+
+
+BallotPads = List[Tuple[ContestPad, List[SelectionPad]]]
+
+
+def make_selection_pad(public_key: ElementModP) -> SelectionPad:
+    """
+    Precomputes the encryption nonce powers and the proof commitments of a
+    selection for both plaintexts, as the voter's choice is still unknown.
+    """
+    nonce = rand_q()
+    u0, c1, v1 = rand_q(), rand_q(), rand_q()
+    simulated_one = a_minus_b_q(v1, a_plus_bc_q(ZERO_MOD_Q, c1, nonce))
+    zero = DisjunctiveCommitments(
+        u0,
+        c1,
+        v1,
+        g_pow_p(u0),
+        pow_p(public_key, u0),
+        # g^v1 · α^-c1 and K^v1 · g^c1 · β^-c1, with β = K^r
+        g_pow_p(simulated_one),
+        mult_p(pow_p(public_key, simulated_one), g_pow_p(c1)),
+    )
+
+    c0, v0, u1 = rand_q(), rand_q(), rand_q()
+    simulated_zero = a_minus_b_q(v0, a_plus_bc_q(ZERO_MOD_Q, c0, nonce))
+    one = DisjunctiveCommitments(
+        u1,
+        c0,
+        v0,
+        # g^v0 · α^-c0 and K^v0 · β^-c0, with β = g · K^r
+        g_pow_p(simulated_zero),
+        mult_p(pow_p(public_key, simulated_zero), g_pow_p(negate_q(c0))),
+        g_pow_p(u1),
+        pow_p(public_key, u1),
+    )
+
+    return SelectionPad(nonce, g_pow_p(nonce), pow_p(public_key, nonce), (zero, one))
+
+
+def make_contest_pad(public_key: ElementModP) -> ContestPad:
+    secret = rand_q()
+    return ContestPad(secret, g_pow_p(secret), pow_p(public_key, secret))
+
+
+def make_ballot_pads(
+    election_metadata: InternalElectionDescription,
+    public_key: ElementModP,
+    ballot_style: str,
+) -> BallotPads:
+    return [
+        (
+            make_contest_pad(public_key),
+            [
+                make_selection_pad(public_key)
+                for _ in contest.ballot_selections + contest.placeholder_selections
+            ],
+        )
+        for contest in election_metadata.get_contests_for(ballot_style)
+    ]
+
+
+def encrypt_selection_with_pad(
+    selection_description: SelectionDescription,
+    plaintext: int,
+    is_placeholder: bool,
+    pad: SelectionPad,
+    election_context: CiphertextElectionContext,
+) -> CiphertextBallotSelection:
+    data = pad.key_power if plaintext == 0 else mult_p(G, pad.key_power)
+    ciphertext = ElGamalCiphertext(pad.pad, data)
+    commitments = pad.commitments[plaintext]
+    challenge = hash_elems(
+        election_context.crypto_extended_base_hash,
+        ciphertext.pad,
+        ciphertext.data,
+        commitments.proof_zero_pad,
+        commitments.proof_zero_data,
+        commitments.proof_one_pad,
+        commitments.proof_one_data,
+    )
+    real_challenge = a_minus_b_q(challenge, commitments.challenge)
+    real_response = a_plus_bc_q(commitments.secret, real_challenge, pad.nonce)
+    if plaintext == 0:
+        challenges = (real_challenge, commitments.challenge)
+        responses = (real_response, commitments.response)
+    else:
+        challenges = (commitments.challenge, real_challenge)
+        responses = (commitments.response, real_response)
+
+    proof = DisjunctiveChaumPedersenProof(
+        commitments.proof_zero_pad,
+        commitments.proof_zero_data,
+        commitments.proof_one_pad,
+        commitments.proof_one_data,
+        *challenges,
+        challenge,
+        *responses,
+    )
+    return make_ciphertext_ballot_selection(
+        object_id=selection_description.object_id,
+        description_hash=selection_description.crypto_hash(),
+        ciphertext=ciphertext,
+        elgamal_public_key=election_context.elgamal_public_key,
+        crypto_extended_base_hash=election_context.crypto_extended_base_hash,
+        proof_seed=ZERO_MOD_Q,
+        selection_representation=plaintext,
+        is_placeholder_selection=is_placeholder,
+        nonce=pad.nonce,
+        proof=proof,
+    )
+
+
+def encrypt_contest_with_pads(
+    contest_description: ContestDescriptionWithPlaceholders,
+    selected: List[bool],
+    pads: Tuple[ContestPad, List[SelectionPad]],
+    election_context: CiphertextElectionContext,
+) -> CiphertextBallotContest:
+    contest_pad, selection_pads = pads
+    # placeholders are selected until the number of elected options is reached
+    placeholders = len(contest_description.placeholder_selections)
+    missing = contest_description.number_elected - sum(selected)
+    plaintexts = [int(choice) for choice in selected] + [
+        int(index < missing) for index in range(placeholders)
+    ]
+    descriptions = (
+        contest_description.ballot_selections
+        + contest_description.placeholder_selections
+    )
+
+    selections = [
+        encrypt_selection_with_pad(
+            description,
+            plaintext,
+            index >= len(selected),
+            pad,
+            election_context,
+        )
+        for index, (description, plaintext, pad) in enumerate(
+            zip(descriptions, plaintexts, selection_pads)
+        )
+    ]
+
+    (alpha, beta) = elgamal_add(*[selection.ciphertext for selection in selections])
+    challenge = hash_elems(
+        election_context.crypto_extended_base_hash,
+        alpha,
+        beta,
+        contest_pad.pad,
+        contest_pad.data,
+    )
+    proof = ConstantChaumPedersenProof(
+        contest_pad.pad,
+        contest_pad.data,
+        challenge,
+        a_plus_bc_q(
+            contest_pad.secret,
+            challenge,
+            add_q(*[pad.nonce for pad in selection_pads]),
+        ),
+        contest_description.number_elected,
+    )
+    return make_ciphertext_ballot_contest(
+        object_id=contest_description.object_id,
+        description_hash=contest_description.crypto_hash(),
+        ballot_selections=selections,
+        elgamal_public_key=election_context.elgamal_public_key,
+        crypto_extended_base_hash=election_context.crypto_extended_base_hash,
+        proof_seed=ZERO_MOD_Q,
+        number_elected=contest_description.number_elected,
+        proof=proof,
+    )
+
+
+def encrypt_ballot_with_pads(
+    ballot: PlaintextBallot,
+    election_metadata: InternalElectionDescription,
+    election_context: CiphertextElectionContext,
+    seed_hash: ElementModQ,
+    pads: BallotPads,
+    should_verify_proofs: bool = True,
+) -> Optional[CiphertextBallot]:
+    """
+    Same as electionguard's `encrypt_ballot` for complete plaintext ballots,
+    using precomputed pads so only hashes and multiplications are left.
+    Invalid plaintext ballots are not encrypted, as their proofs would be invalid.
+    The proofs are verified as the bulletin board does, so a bad pad can't
+    produce a ballot that would be rejected.
+    """
+    if not is_valid_plaintext_ballot(ballot, election_metadata):
+        log.warning(f"malformed input ballot: {ballot.object_id}")
+        return None
+
+    plaintext_contests = {contest.object_id: contest for contest in ballot.contests}
+    contests = []
+    for contest_description, contest_pads in zip(
+        election_metadata.get_contests_for(ballot.ballot_style), pads
+    ):
+        plaintext_selections = {
+            selection.object_id: selection.to_int()
+            for selection in plaintext_contests[
+                contest_description.object_id
+            ].ballot_selections
+        }
+        selected = [
+            bool(plaintext_selections.get(description.object_id))
+            for description in contest_description.ballot_selections
+        ]
+        contests.append(
+            encrypt_contest_with_pads(
+                contest_description, selected, contest_pads, election_context
+            )
+        )
+
+    encrypted_ballot = make_ciphertext_ballot(
+        ballot.object_id,
+        ballot.ballot_style,
+        election_metadata.description_hash,
+        seed_hash,
+        contests,
+    )
+    if (
+        should_verify_proofs
+        and not ballots_are_valid_for_election(
+            [encrypted_ballot], election_metadata, election_context
+        )[0]
+    ):
+        log.warning(f"mismatching ballot proofs for ballot {ballot.object_id}")
+        return None
+
+    return encrypted_ballot
+
+
+def is_valid_plaintext_ballot(
+    ballot: PlaintextBallot, election_metadata: InternalElectionDescription
+) -> bool:
+    """Same input validation as `encrypt_ballot`, for every contest of the ballot style"""
+    contest_descriptions = election_metadata.get_contests_for(ballot.ballot_style)
+    plaintext_contests = {contest.object_id: contest for contest in ballot.contests}
+    return (
+        len(plaintext_contests) == len(ballot.contests)
+        and plaintext_contests.keys()
+        == {description.object_id for description in contest_descriptions}
+        and all(
+            plaintext_contests[description.object_id].is_valid(
+                description.object_id,
+                len(description.ballot_selections),
+                description.number_elected,
+                description.votes_allowed,
+            )
+            for description in contest_descriptions
+        )
+    )
+
+
+class EncryptionPadPool(Thread):
+    """
+    Background worker keeping a pool of precomputed ballot pads. When less
+    than `refill_below` pads are left, it computes pads until the pool holds
+    `size` of them. Every pad is handed out only once.
+    """
+
+    election_metadata: InternalElectionDescription
+    public_key: ElementModP
+    ballot_style: str
+    size: int
+    refill_below: int
+
+    _condition: Condition
+    _pads: Deque[BallotPads]
+    _stopped: bool
+
+    def __init__(
+        self,
+        election_metadata: InternalElectionDescription,
+        public_key: ElementModP,
+        ballot_style: str,
+        size: int,
+        refill_below: Optional[int] = None,
+    ) -> None:
+        super().__init__(daemon=True)
+        self.election_metadata = election_metadata
+        self.public_key = public_key
+        self.ballot_style = ballot_style
+        self.size = size
+        self.refill_below = min(size, max(1, refill_below or size))
+        self._condition = Condition()
+        self._pads = deque()
+        self._stopped = False
+
+    def __len__(self) -> int:
+        return len(self._pads)
+
+    def take(self) -> BallotPads:
+        """Returns precomputed pads, or computes them when the pool is empty"""
+        with self._condition:
+            pads = self._pads.popleft() if self._pads else None
+            self._condition.notify()
+
+        return pads or self._make_pads()
+
+    def stop(self, wait: bool = True) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if wait:
+            self.join()
+
+    def run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._stopped or len(self._pads) < self.refill_below
+                )
+                if self._stopped:
+                    return
+
+            while len(self._pads) < self.size and not self._stopped:
+                pads = self._make_pads()
+                with self._condition:
+                    self._pads.append(pads)
+                    self._condition.notify_all()
+
+    def _make_pads(self) -> BallotPads:
+        return make_ballot_pads(
+            self.election_metadata, self.public_key, self.ballot_style
+        )
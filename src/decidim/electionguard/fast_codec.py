@@ -0,0 +1,512 @@
+"""
+Hand-written encoders and decoders for the messages exchanged on every ballot,
+key ceremony and tally step. They produce the same JSON as the jsons-based
+`serialize` and the same objects as `deserialize`, without reflection.
+
+Keys follow jsons: object attributes are sorted, named tuples keep their
+field order, `None` values and nonces are left out. Group elements are left
+in the encoded objects, so each wire format can write them its own way.
+"""
+
+from typing import Any, Callable, Dict, Optional, Type
+from electionguard.ballot import (
+    CiphertextBallot,
+    CiphertextBallotContest,
+    CiphertextBallotSelection,
+)
+from electionguard.chaum_pedersen import (
+    ChaumPedersenProof,
+    ConstantChaumPedersenProof,
+    DisjunctiveChaumPedersenProof,
+)
+from electionguard.decryption_share import (
+    CiphertextCompensatedDecryptionSelection,
+    CiphertextDecryptionContest,
+    CiphertextDecryptionSelection,
+)
+from electionguard.elgamal import ElGamalCiphertext
+from electionguard.group import (
+    ElementModP,
+    ElementModQ,
+    int_to_p_unchecked,
+    int_to_q_unchecked,
+)
+from electionguard.key_ceremony import ElectionPartialKeyBackup, PublicKeySet
+from electionguard.proof import ProofUsage
+from electionguard.schnorr import SchnorrProof
+from electionguard.tally import CiphertextTallyContest, CiphertextTallySelection
+from electionguard.types import CONTEST_ID
+from .messages import TrusteePartialKeys, TrusteeShare
+from .serializable import int_to_maybe_base64, maybe_base64_to_int
+
+TallyCast = Dict[CONTEST_ID, CiphertextTallyContest]
+
+
+def encode_element(element: Any) -> Any:
+    return int_to_maybe_base64(element.to_int())
+
+
+def json_values(value: Any) -> Any:
+    """Encodes the group elements left in an encoded object as jsons does"""
+    if isinstance(value, dict):
+        return {key: json_values(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [json_values(item) for item in value]
+    if isinstance(value, (ElementModP, ElementModQ)):
+        return encode_element(value)
+    return value
+
+
+def decode_p(value: Any) -> ElementModP:
+    return int_to_p_unchecked(maybe_base64_to_int(value))
+
+
+def decode_q(value: Any) -> ElementModQ:
+    return int_to_q_unchecked(maybe_base64_to_int(value))
+
+
+def decode_optional_q(values: dict, key: str) -> Optional[ElementModQ]:
+    return decode_q(values[key]) if values.get(key) is not None else None
+
+
+def without_nulls(values: dict) -> dict:
+    return {key: value for key, value in values.items() if value is not None}
+
+
+# Group objects
+
+
+def encode_ciphertext(ciphertext: ElGamalCiphertext) -> dict:
+    return {
+        "pad": ciphertext.pad,
+        "data": ciphertext.data,
+    }
+
+
+def decode_ciphertext(values: dict) -> ElGamalCiphertext:
+    return ElGamalCiphertext(decode_p(values["pad"]), decode_p(values["data"]))
+
+
+def encode_schnorr_proof(proof: SchnorrProof) -> dict:
+    return {
+        "challenge": proof.challenge,
+        "commitment": proof.commitment,
+        "name": proof.name,
+        "public_key": proof.public_key,
+        "response": proof.response,
+        "usage": proof.usage.name,
+    }
+
+
+def decode_schnorr_proof(values: dict) -> SchnorrProof:
+    return SchnorrProof(
+        decode_p(values["public_key"]),
+        decode_p(values["commitment"]),
+        decode_q(values["challenge"]),
+        decode_q(values["response"]),
+        ProofUsage[values["usage"]],
+    )
+
+
+def encode_chaum_pedersen_proof(proof: ChaumPedersenProof) -> dict:
+    return {
+        "challenge": proof.challenge,
+        "data": proof.data,
+        "name": proof.name,
+        "pad": proof.pad,
+        "response": proof.response,
+        "usage": proof.usage.name,
+    }
+
+
+def decode_chaum_pedersen_proof(values: dict) -> ChaumPedersenProof:
+    return ChaumPedersenProof(
+        decode_p(values["pad"]),
+        decode_p(values["data"]),
+        decode_q(values["challenge"]),
+        decode_q(values["response"]),
+        ProofUsage[values["usage"]],
+    )
+
+
+def encode_constant_proof(proof: ConstantChaumPedersenProof) -> dict:
+    return {
+        "challenge": proof.challenge,
+        "constant": int_to_maybe_base64(proof.constant),
+        "data": proof.data,
+        "name": proof.name,
+        "pad": proof.pad,
+        "response": proof.response,
+        "usage": proof.usage.name,
+    }
+
+
+def decode_constant_proof(values: dict) -> ConstantChaumPedersenProof:
+    return ConstantChaumPedersenProof(
+        decode_p(values["pad"]),
+        decode_p(values["data"]),
+        decode_q(values["challenge"]),
+        decode_q(values["response"]),
+        maybe_base64_to_int(values["constant"]),
+        ProofUsage[values["usage"]],
+    )
+
+
+def encode_disjunctive_proof(proof: DisjunctiveChaumPedersenProof) -> dict:
+    return {
+        "challenge": proof.challenge,
+        "name": proof.name,
+        "proof_one_challenge": proof.proof_one_challenge,
+        "proof_one_data": proof.proof_one_data,
+        "proof_one_pad": proof.proof_one_pad,
+        "proof_one_response": proof.proof_one_response,
+        "proof_zero_challenge": proof.proof_zero_challenge,
+        "proof_zero_data": proof.proof_zero_data,
+        "proof_zero_pad": proof.proof_zero_pad,
+        "proof_zero_response": proof.proof_zero_response,
+        "usage": proof.usage.name,
+    }
+
+
+def decode_disjunctive_proof(values: dict) -> DisjunctiveChaumPedersenProof:
+    return DisjunctiveChaumPedersenProof(
+        decode_p(values["proof_zero_pad"]),
+        decode_p(values["proof_zero_data"]),
+        decode_p(values["proof_one_pad"]),
+        decode_p(values["proof_one_data"]),
+        decode_q(values["proof_zero_challenge"]),
+        decode_q(values["proof_one_challenge"]),
+        decode_q(values["challenge"]),
+        decode_q(values["proof_zero_response"]),
+        decode_q(values["proof_one_response"]),
+        ProofUsage[values["usage"]],
+    )
+
+
+# Ballots
+
+
+def encode_ballot_selection(selection: CiphertextBallotSelection) -> dict:
+    return without_nulls(
+        {
+            "ciphertext": encode_ciphertext(selection.ciphertext),
+            "crypto_hash": selection.crypto_hash,
+            "description_hash": selection.description_hash,
+            "extended_data": selection.extended_data
+            and encode_ciphertext(selection.extended_data),
+            "is_placeholder_selection": selection.is_placeholder_selection,
+            "object_id": selection.object_id,
+            "proof": selection.proof and encode_disjunctive_proof(selection.proof),
+        }
+    )
+
+
+def decode_ballot_selection(values: dict) -> CiphertextBallotSelection:
+    return CiphertextBallotSelection(
+        values["object_id"],
+        decode_q(values["description_hash"]),
+        decode_ciphertext(values["ciphertext"]),
+        decode_q(values["crypto_hash"]),
+        values["is_placeholder_selection"],
+        None,
+        values.get("proof") and decode_disjunctive_proof(values["proof"]),
+        values.get("extended_data") and decode_ciphertext(values["extended_data"]),
+    )
+
+
+def encode_ballot_contest(contest: CiphertextBallotContest) -> dict:
+    return without_nulls(
+        {
+            "ballot_selections": [
+                encode_ballot_selection(selection)
+                for selection in contest.ballot_selections
+            ],
+            "crypto_hash": contest.crypto_hash,
+            "description_hash": contest.description_hash,
+            "object_id": contest.object_id,
+            "proof": contest.proof and encode_constant_proof(contest.proof),
+        }
+    )
+
+
+def decode_ballot_contest(values: dict) -> CiphertextBallotContest:
+    return CiphertextBallotContest(
+        values["object_id"],
+        decode_q(values["description_hash"]),
+        [
+            decode_ballot_selection(selection)
+            for selection in values["ballot_selections"]
+        ],
+        decode_q(values["crypto_hash"]),
+        None,
+        values.get("proof") and decode_constant_proof(values["proof"]),
+    )
+
+
+def encode_ballot(ballot: CiphertextBallot) -> dict:
+    return without_nulls(
+        {
+            "ballot_style": ballot.ballot_style,
+            "contests": [encode_ballot_contest(contest) for contest in ballot.contests],
+            "crypto_hash": ballot.crypto_hash,
+            "description_hash": ballot.description_hash,
+            "object_id": ballot.object_id,
+            "previous_tracking_hash": ballot.previous_tracking_hash,
+            "timestamp": int_to_maybe_base64(ballot.timestamp),
+            "tracking_hash": ballot.tracking_hash,
+        }
+    )
+
+
+def decode_ballot(values: dict) -> CiphertextBallot:
+    return CiphertextBallot(
+        values["object_id"],
+        values["ballot_style"],
+        decode_q(values["description_hash"]),
+        decode_q(values["previous_tracking_hash"]),
+        [decode_ballot_contest(contest) for contest in values["contests"]],
+        decode_optional_q(values, "tracking_hash"),
+        maybe_base64_to_int(values["timestamp"]),
+        decode_q(values["crypto_hash"]),
+        None,
+    )
+
+
+# Key ceremony
+
+
+def encode_public_key_set(public_keys: PublicKeySet) -> dict:
+    return {
+        "owner_id": public_keys.owner_id,
+        "sequence_order": int_to_maybe_base64(public_keys.sequence_order),
+        "auxiliary_public_key": public_keys.auxiliary_public_key,
+        "election_public_key": public_keys.election_public_key,
+        "election_public_key_proof": encode_schnorr_proof(
+            public_keys.election_public_key_proof
+        ),
+    }
+
+
+def decode_public_key_set(values: dict) -> PublicKeySet:
+    return PublicKeySet(
+        values["owner_id"],
+        maybe_base64_to_int(values["sequence_order"]),
+        values["auxiliary_public_key"],
+        decode_p(values["election_public_key"]),
+        decode_schnorr_proof(values["election_public_key_proof"]),
+    )
+
+
+def encode_partial_key_backup(backup: ElectionPartialKeyBackup) -> dict:
+    return {
+        "owner_id": backup.owner_id,
+        "designated_id": backup.designated_id,
+        "designated_sequence_order": int_to_maybe_base64(
+            backup.designated_sequence_order
+        ),
+        "encrypted_value": backup.encrypted_value,
+        "coefficient_commitments": [
+            commitment for commitment in backup.coefficient_commitments
+        ],
+        "coefficient_proofs": [
+            encode_schnorr_proof(proof) for proof in backup.coefficient_proofs
+        ],
+    }
+
+
+def decode_partial_key_backup(values: dict) -> ElectionPartialKeyBackup:
+    return ElectionPartialKeyBackup(
+        values["owner_id"],
+        values["designated_id"],
+        maybe_base64_to_int(values["designated_sequence_order"]),
+        values["encrypted_value"],
+        [decode_p(commitment) for commitment in values["coefficient_commitments"]],
+        [decode_schnorr_proof(proof) for proof in values["coefficient_proofs"]],
+    )
+
+
+def encode_trustee_partial_keys(partial_keys: TrusteePartialKeys) -> dict:
+    return {
+        "guardian_id": partial_keys.guardian_id,
+        "partial_keys": [
+            encode_partial_key_backup(backup) for backup in partial_keys.partial_keys
+        ],
+    }
+
+
+def decode_trustee_partial_keys(values: dict) -> TrusteePartialKeys:
+    return TrusteePartialKeys(
+        values["guardian_id"],
+        [decode_partial_key_backup(backup) for backup in values["partial_keys"]],
+    )
+
+
+# Tally
+
+
+def encode_tally_cast(tally_cast: TallyCast) -> dict:
+    return {
+        contest_id: {
+            "description_hash": contest.description_hash,
+            "object_id": contest.object_id,
+            "tally_selections": {
+                selection_id: {
+                    "ciphertext": encode_ciphertext(selection.ciphertext),
+                    "description_hash": selection.description_hash,
+                    "object_id": selection.object_id,
+                }
+                for selection_id, selection in contest.tally_selections.items()
+            },
+        }
+        for contest_id, contest in tally_cast.items()
+    }
+
+
+def decode_tally_cast(values: dict) -> TallyCast:
+    return {
+        contest_id: CiphertextTallyContest(
+            contest["object_id"],
+            decode_q(contest["description_hash"]),
+            {
+                selection_id: CiphertextTallySelection(
+                    selection["object_id"],
+                    decode_q(selection["description_hash"]),
+                    decode_ciphertext(selection["ciphertext"]),
+                )
+                for selection_id, selection in contest["tally_selections"].items()
+            },
+        )
+        for contest_id, contest in values.items()
+    }
+
+
+def encode_recovered_part(part: CiphertextCompensatedDecryptionSelection) -> dict:
+    return without_nulls(
+        {
+            "description_hash": part.description_hash,
+            "guardian_id": part.guardian_id,
+            "missing_guardian_id": part.missing_guardian_id,
+            "object_id": part.object_id,
+            "proof": part.proof and encode_chaum_pedersen_proof(part.proof),
+            "recovery_key": part.recovery_key,
+            "share": part.share,
+        }
+    )
+
+
+def decode_recovered_part(values: dict) -> CiphertextCompensatedDecryptionSelection:
+    return CiphertextCompensatedDecryptionSelection(
+        values["object_id"],
+        values["guardian_id"],
+        values["missing_guardian_id"],
+        decode_q(values["description_hash"]),
+        decode_p(values["share"]),
+        decode_p(values["recovery_key"]),
+        values.get("proof") and decode_chaum_pedersen_proof(values["proof"]),
+    )
+
+
+def encode_decryption_selection(selection: CiphertextDecryptionSelection) -> dict:
+    return without_nulls(
+        {
+            "description_hash": selection.description_hash,
+            "guardian_id": selection.guardian_id,
+            "object_id": selection.object_id,
+            "proof": selection.proof and encode_chaum_pedersen_proof(selection.proof),
+            "recovered_parts": selection.recovered_parts
+            and {
+                guardian_id: encode_recovered_part(part)
+                for guardian_id, part in selection.recovered_parts.items()
+            },
+            "share": selection.share,
+        }
+    )
+
+
+def decode_decryption_selection(values: dict) -> CiphertextDecryptionSelection:
+    recovered_parts = values.get("recovered_parts")
+    return CiphertextDecryptionSelection(
+        values["object_id"],
+        values["guardian_id"],
+        decode_q(values["description_hash"]),
+        decode_p(values["share"]),
+        values.get("proof") and decode_chaum_pedersen_proof(values["proof"]),
+        recovered_parts
+        and {
+            guardian_id: decode_recovered_part(part)
+            for guardian_id, part in recovered_parts.items()
+        },
+    )
+
+
+def encode_trustee_share(share: TrusteeShare) -> dict:
+    return {
+        "contests": {
+            contest_id: {
+                "description_hash": contest.description_hash,
+                "guardian_id": contest.guardian_id,
+                "object_id": contest.object_id,
+                "selections": {
+                    selection_id: encode_decryption_selection(selection)
+                    for selection_id, selection in contest.selections.items()
+                },
+            }
+            for contest_id, contest in share.contests.items()
+        },
+        "guardian_id": share.guardian_id,
+        "public_key": share.public_key,
+    }
+
+
+def decode_trustee_share(values: dict) -> TrusteeShare:
+    return TrusteeShare(
+        values["guardian_id"],
+        decode_p(values["public_key"]),
+        {
+            contest_id: CiphertextDecryptionContest(
+                contest["object_id"],
+                contest["guardian_id"],
+                decode_q(contest["description_hash"]),
+                {
+                    selection_id: decode_decryption_selection(selection)
+                    for selection_id, selection in contest["selections"].items()
+                },
+            )
+            for contest_id, contest in values["contests"].items()
+        },
+    )
+
+
+ENCODERS: Dict[type, Callable[[Any], dict]] = {
+    CiphertextBallot: encode_ballot,
+    PublicKeySet: encode_public_key_set,
+    ElectionPartialKeyBackup: encode_partial_key_backup,
+    TrusteePartialKeys: encode_trustee_partial_keys,
+    TrusteeShare: encode_trustee_share,
+}
+
+DECODERS: Dict[Any, Callable[[dict], Any]] = {
+    CiphertextBallot: decode_ballot,
+    PublicKeySet: decode_public_key_set,
+    ElectionPartialKeyBackup: decode_partial_key_backup,
+    TrusteePartialKeys: decode_trustee_partial_keys,
+    TrusteeShare: decode_trustee_share,
+    TallyCast: decode_tally_cast,
+}
+
+
+def encoder_for(obj: Any) -> Optional[Callable[[Any], dict]]:
+    if isinstance(obj, dict):
+        is_tally_cast = obj and all(
+            type(contest) is CiphertextTallyContest for contest in obj.values()
+        )
+        return encode_tally_cast if is_tally_cast else None
+
+    return ENCODERS.get(type(obj))
+
+
+def decoder_for(type: Type) -> Optional[Callable[[dict], Any]]:
+    try:
+        return DECODERS.get(type)
+    except TypeError:  # unhashable type hints
+        return None
@@ -0,0 +1,107 @@
+from collections import OrderedDict
+from typing import List
+from electionguard.group import (
+    ElementModP,
+    ElementModPOrQorInt,
+    ElementModPOrQ,
+    G,
+    P,
+    Q,
+    int_to_p_unchecked,
+)
+import electionguard.chaum_pedersen
+import electionguard.elgamal
+import electionguard.group
+from gmpy2 import mpz
+
+WINDOW_BITS = 8
+EXPONENT_BITS = Q.bit_length()
+
+# Every table takes ~4MB, keep only the ones of the most recently used joint keys
+MAX_JOINT_KEYS = 4
+
+# modules that imported `pow_p` and `g_pow_p` from `electionguard.group`
+PATCHED_MODULES = [
+    electionguard.chaum_pedersen,
+    electionguard.elgamal,
+    electionguard.group,
+]
+
+old_pow_p = electionguard.group.pow_p
+
+
+class FixedBaseTable:
+    """
+    Powers of a fixed base for every window of the exponent, so raising it to
+    any exponent below 2^EXPONENT_BITS only takes one multiplication per window.
+    """
+
+    base: mpz
+    windows: List[List[mpz]]
+
+    def __init__(self, base: int) -> None:
+        self.base = mpz(base)
+        self.windows = []
+
+        power = self.base
+        for _ in range(-(-EXPONENT_BITS // WINDOW_BITS)):
+            window = [mpz(1), power]
+            for _ in range((1 << WINDOW_BITS) - 2):
+                window.append(window[-1] * power % P)
+            self.windows.append(window)
+            power = window[-1] * power % P
+
+    def pow(self, exponent: int) -> mpz:
+        result = mpz(1)
+        mask = (1 << WINDOW_BITS) - 1
+        for window in self.windows:
+            if not exponent:
+                break
+            digit = exponent & mask
+            if digit:
+                result = result * window[digit] % P
+            exponent >>= WINDOW_BITS
+        return result
+
+
+# tables by base, from the least to the most recently used
+_tables: OrderedDict = OrderedDict()
+
+
+def register_fixed_bases(joint_key: ElementModP) -> None:
+    """
+    Builds the tables for the generator and the election joint key, and makes
+    electionguard use them for encryption, proofs and their verification.
+    """
+    for base in (mpz(G), joint_key.elem):
+        if base in _tables:
+            _tables.move_to_end(base)
+        else:
+            _tables[base] = FixedBaseTable(base)
+
+    joint_keys = [base for base in _tables if base != G]
+    for base in joint_keys[:-MAX_JOINT_KEYS]:
+        del _tables[base]
+
+    for module in PATCHED_MODULES:
+        module.pow_p = pow_p
+        module.g_pow_p = g_pow_p
+
+
+def pow_p(b: ElementModPOrQorInt, e: ElementModPOrQorInt) -> ElementModP:
+    base = getattr(b, "elem", b)
+    table = _tables.get(base)
+    exponent = getattr(e, "elem", e)
+    if table is None or not 0 <= exponent < 1 << EXPONENT_BITS:
+        return old_pow_p(b, e)
+
+    try:
+        _tables.move_to_end(base)
+    except KeyError:
+        # dropped by another thread registering a new joint key
+        pass
+    return int_to_p_unchecked(table.pow(int(exponent)))
+
+
+def g_pow_p(e: ElementModPOrQ) -> ElementModP:
+    return pow_p(G, e)
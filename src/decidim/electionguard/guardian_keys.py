@@ -0,0 +1,168 @@
+from base64 import urlsafe_b64encode
+from contextlib import contextmanager
+from fcntl import LOCK_EX, flock
+from pathlib import Path
+from tempfile import mkstemp
+from typing import Iterator, List, NamedTuple, Optional
+import os
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.hashes import SHA256
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from electionguard.guardian import Guardian
+from electionguard.key_ceremony import (
+    AuxiliaryKeyPair,
+    ElectionKeyPair,
+    generate_election_key_pair,
+    generate_rsa_auxiliary_key_pair,
+)
+from electionguard.types import GUARDIAN_ID
+from .dummy_scheduler import DummyScheduler, Scheduler
+from .utils import InvalidGuardianKeys, deserialize, serialize
+
+SALT_SIZE = 16
+KDF_ITERATIONS = 390_000
+
+
+class GuardianKeys(NamedTuple):
+    """Key material of a guardian that doesn't depend on the election"""
+
+    auxiliary_keys: AuxiliaryKeyPair
+    election_keys: ElectionKeyPair
+
+
+def generate_guardian_keys(quorum: int) -> GuardianKeys:
+    return GuardianKeys(
+        generate_rsa_auxiliary_key_pair(), generate_election_key_pair(quorum)
+    )
+
+
+class PregeneratedGuardian(Guardian):
+    """
+    Guardian using the given key material instead of generating it. Resetting
+    the guardian generates new keys.
+    """
+
+    def __init__(
+        self,
+        id: GUARDIAN_ID,
+        sequence_order: int,
+        number_of_guardians: int,
+        quorum: int,
+        keys: GuardianKeys,
+    ) -> None:
+        self._pregenerated_keys = keys
+        super().__init__(id, sequence_order, number_of_guardians, quorum)
+        del self._pregenerated_keys
+
+    def generate_auxiliary_key_pair(self, *args) -> None:
+        keys = getattr(self, "_pregenerated_keys", None)
+        if keys is None:
+            super().generate_auxiliary_key_pair(*args)
+        else:
+            super().generate_auxiliary_key_pair(lambda: keys.auxiliary_keys)
+
+    def generate_election_key_pair(self, *args) -> None:
+        keys = getattr(self, "_pregenerated_keys", None)
+        if keys is None:
+            super().generate_election_key_pair(*args)
+        else:
+            self._election_keys = keys.election_keys
+            self.save_election_public_key(self.share_election_public_key())
+
+
+class GuardianKeyStore:
+    """
+    Guardian key material generated offline, stored in one file per number of
+    guardians and quorum. Files are encrypted with a key derived from the
+    passphrase, and every set of keys is removed from its file when taken, so
+    it is never used by two guardians. Files are only changed while holding an
+    exclusive lock, shared by every process using the same directory.
+    """
+
+    directory: Path
+    passphrase: bytes
+
+    def __init__(self, directory: Path, passphrase: str) -> None:
+        self.directory = Path(directory)
+        self.passphrase = passphrase.encode("utf-8")
+
+    def path_for(self, number_of_guardians: int, quorum: int) -> Path:
+        return self.directory / f"guardian-keys-{number_of_guardians}-{quorum}.bin"
+
+    def precompute(
+        self,
+        number_of_guardians: int,
+        quorum: int,
+        count: int,
+        scheduler: Optional[Scheduler] = None,
+    ) -> None:
+        """Generates `count` more sets of keys for the given scheme"""
+        keys = (scheduler or DummyScheduler()).schedule(
+            generate_guardian_keys, [(quorum,)] * count
+        )
+        path = self.path_for(number_of_guardians, quorum)
+        with self._locked(path):
+            self._write(path, self._read(path) + keys)
+
+    def available(self, number_of_guardians: int, quorum: int) -> int:
+        return len(self._read(self.path_for(number_of_guardians, quorum)))
+
+    def take(self, number_of_guardians: int, quorum: int) -> Optional[GuardianKeys]:
+        path = self.path_for(number_of_guardians, quorum)
+        with self._locked(path):
+            keys = self._read(path)
+            if not keys:
+                return None
+
+            self._write(path, keys[1:])
+        return keys[0]
+
+    @contextmanager
+    def _locked(self, path: Path) -> Iterator[None]:
+        # the keys file is replaced when written, so a separate file is locked
+        self.directory.mkdir(parents=True, exist_ok=True)
+        descriptor = os.open(path.with_suffix(".lock"), os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            flock(descriptor, LOCK_EX)
+            yield
+        finally:
+            os.close(descriptor)
+
+    def _read(self, path: Path) -> List[GuardianKeys]:
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return []
+
+        try:
+            content = self._fernet(data[:SALT_SIZE]).decrypt(data[SALT_SIZE:])
+        except InvalidToken:
+            raise InvalidGuardianKeys()
+        return deserialize(content.decode("utf-8"), List[GuardianKeys])
+
+    def _write(self, path: Path, keys: List[GuardianKeys]) -> None:
+        salt = os.urandom(SALT_SIZE)
+        content = serialize(keys, include_private=True).encode("utf-8")
+
+        # created with O_EXCL and readable only by its owner
+        descriptor, partial_path = mkstemp(
+            dir=self.directory, prefix=f"{path.name}.", suffix=".partial"
+        )
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(salt + self._fernet(salt).encrypt(content))
+            os.replace(partial_path, path)
+        except BaseException:
+            os.unlink(partial_path)
+            raise
+
+    def _fernet(self, salt: bytes) -> Fernet:
+        kdf = PBKDF2HMAC(
+            algorithm=SHA256(),
+            length=32,
+            salt=salt,
+            iterations=KDF_ITERATIONS,
+            backend=default_backend(),
+        )
+        return Fernet(urlsafe_b64encode(kdf.derive(self.passphrase)))
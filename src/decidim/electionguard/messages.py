@@ -1,12 +1,13 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from electionguard.decryption_share import CiphertextDecryptionContest
-from electionguard.group import ElementModP
+from electionguard.group import ElementModP, ElementModQ
 from electionguard.key_ceremony import (
     ElectionPartialKeyVerification,
     ElectionPartialKeyBackup,
 )
 from electionguard.serializable import Serializable
-from electionguard.types import CONTEST_ID, GUARDIAN_ID
+from electionguard.tally import CiphertextTallyContest
+from electionguard.types import BALLOT_ID, CONTEST_ID, GUARDIAN_ID
 from typing import Dict, List
 
 
@@ -32,3 +33,11 @@ class TrusteeShare(Serializable):
     guardian_id: GUARDIAN_ID
     public_key: ElementModP
     contests: Dict[CONTEST_ID, CiphertextDecryptionContest]
+
+
+@dataclass
+class PartialTally(Serializable):
+    ballot_hashes: Dict[BALLOT_ID, ElementModQ]
+    contests: Dict[CONTEST_ID, CiphertextTallyContest]
+    # hex digests of the ballot contents, so replayed ballots are recognized
+    ballot_digests: Dict[BALLOT_ID, str] = field(default_factory=dict)
@@ -1,11 +1,12 @@
 from base64 import b64encode, b64decode
+from functools import lru_cache
 from electionguard.group import (
     ElementModP,
     ElementModQ,
     int_to_p_unchecked,
     int_to_q_unchecked,
 )
-from typing import Union, Final
+from typing import Dict, Union, Final
 import electionguard.serializable
 
 old_set_serializers = electionguard.serializable.set_serializers
@@ -23,6 +24,10 @@ def monkey_patch_serialization():
 
 ENCODE_THRESHOLD: Final[int] = 100_000_000
 
+# Encoded integers kept by each conversion cache. Hashes, keys and the proof
+# commitments of a few ballots repeat across messages, other values are evicted.
+CONVERSION_CACHE_SIZE: Final[int] = 4096
+
 
 def int_to_maybe_base64(i: int) -> Union[str, int]:
     """
@@ -39,6 +44,11 @@ def int_to_maybe_base64(i: int) -> Union[str, int]:
     if i < ENCODE_THRESHOLD:
         return i
 
+    return int_to_base64(i)
+
+
+@lru_cache(maxsize=CONVERSION_CACHE_SIZE)
+def int_to_base64(i: int) -> str:
     # relevant discussion: https://stackoverflow.com/a/12859903/4048276
     b = i.to_bytes((i.bit_length() + 7) // 8, "big") or b"\0"
     return b64encode(b).decode("utf-8")
@@ -56,10 +66,34 @@ def maybe_base64_to_int(i: Union[str, int]) -> int:
     if isinstance(i, int):
         return i
 
+    return base64_to_int(i)
+
+
+@lru_cache(maxsize=CONVERSION_CACHE_SIZE)
+def base64_to_int(i: str) -> int:
     b = b64decode(i)
     return int.from_bytes(b, byteorder="big", signed=False)
 
 
+def conversion_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Hits, misses and size of the base64 conversion caches"""
+    stats = {}
+    for cache in (int_to_base64, base64_to_int):
+        info = cache.cache_info()
+        stats[cache.__name__] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "maxsize": info.maxsize,
+        }
+    return stats
+
+
+def clear_conversion_caches() -> None:
+    int_to_base64.cache_clear()
+    base64_to_int.cache_clear()
+
+
 def set_serializers():
     old_set_serializers()
     electionguard.serializable.set_serializer(
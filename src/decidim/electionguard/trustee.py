@@ -1,32 +1,149 @@
-from electionguard.decryption import compute_decryption_share_for_selection
+from electionguard.chaum_pedersen import make_chaum_pedersen
 from electionguard.decryption_share import (
     CiphertextDecryptionContest,
     CiphertextDecryptionSelection,
+    create_ciphertext_decryption_selection,
 )
-from electionguard.key_ceremony import PublicKeySet
+from electionguard.elgamal import ElGamalKeyPair
+from electionguard.group import ElementModQ, rand_q
+from electionguard.key_ceremony import (
+    AuxiliaryKeyPair,
+    ElectionPartialKeyBackup,
+    ElectionPartialKeyVerification,
+    PublicKeySet,
+    generate_election_partial_key_backup,
+    verify_election_partial_key_backup,
+)
+from electionguard.rsa import rsa_decrypt, rsa_encrypt
 from electionguard.guardian import Guardian
-from electionguard.tally import CiphertextTallyContest
+from electionguard.tally import CiphertextTallyContest, CiphertextTallySelection
 from electionguard.types import CONTEST_ID, GUARDIAN_ID, SELECTION_ID
 from electionguard.utils import get_optional
 from typing import Dict, Set, List, Optional, Literal, Tuple
 from .common import Context, ElectionStep, Wrapper, Content
+from .dummy_scheduler import DummyScheduler, Scheduler
+from .guardian_keys import GuardianKeyStore, PregeneratedGuardian
 from .messages import (
     TrusteePartialKeys,
     TrusteeVerification,
     JointElectionKey,
     TrusteeShare,
 )
-from .utils import pair_with_object_id, serialize, deserialize
+from .utils import (
+    pair_with_object_id,
+    deserialize,
+    deserialize_from_dict,
+    parse_content,
+)
 
 
 class TrusteeContext(Context):
     guardian: Guardian
     guardian_id: GUARDIAN_ID
     guardian_ids: Set[GUARDIAN_ID]
+    guardian_key_store: Optional[GuardianKeyStore] = None
 
     def __init__(self, guardian_id: GUARDIAN_ID) -> None:
         self.guardian_id = guardian_id
 
+    def __getstate__(self):
+        # the key store holds the passphrase, it is never stored
+        state = self.__dict__.copy()
+        state.pop("guardian_key_store", None)
+        return state
+
+    def build_guardian(self, order: int) -> Guardian:
+        """Uses pre-generated keys for the election scheme when there are any left"""
+        keys = None
+        if self.guardian_key_store:
+            keys = self.guardian_key_store.take(self.number_of_guardians, self.quorum)
+
+        if keys is None:
+            return Guardian(
+                self.guardian_id, order, self.number_of_guardians, self.quorum
+            )
+        return PregeneratedGuardian(
+            self.guardian_id, order, self.number_of_guardians, self.quorum, keys
+        )
+
+
+def generate_election_partial_key_backups(
+    guardian: Guardian, scheduler: Scheduler
+) -> bool:
+    """
+    Same as `Guardian.generate_election_partial_key_backups`, computing the
+    backups for every guardian with the scheduler. The polynomial is sent once
+    to every worker.
+    """
+    auxiliary_keys = list(guardian._guardian_auxiliary_public_keys.values())
+    backups = scheduler.schedule(
+        generate_election_partial_key_backup,
+        [(key, rsa_encrypt) for key in auxiliary_keys],
+        shared_arguments=(guardian.object_id, guardian._election_keys.polynomial),
+    )
+
+    for auxiliary_key, backup in zip(auxiliary_keys, backups):
+        if backup is None:
+            return False
+        guardian._backups_to_share.set(auxiliary_key.owner_id, backup)
+    return True
+
+
+def verify_election_partial_key_backups(
+    guardian: Guardian, guardian_ids: List[GUARDIAN_ID], scheduler: Scheduler
+) -> List[Optional[ElectionPartialKeyVerification]]:
+    """
+    Same as `Guardian.verify_election_partial_key_backup` for every given
+    guardian, verifying the backups with the scheduler. The auxiliary keys are
+    sent once to every worker.
+    """
+    backups = [
+        guardian._guardian_election_partial_key_backups.get(guardian_id)
+        for guardian_id in guardian_ids
+    ]
+    verifications = iter(
+        scheduler.schedule(
+            verify_backup,
+            [(backup,) for backup in backups if backup is not None],
+            shared_arguments=(guardian.object_id, guardian._auxiliary_keys),
+        )
+    )
+    return [next(verifications) if backup is not None else None for backup in backups]
+
+
+def verify_backup(
+    verifier_id: GUARDIAN_ID,
+    auxiliary_keys: AuxiliaryKeyPair,
+    backup: ElectionPartialKeyBackup,
+) -> ElectionPartialKeyVerification:
+    return verify_election_partial_key_backup(
+        verifier_id, backup, auxiliary_keys, rsa_decrypt
+    )
+
+
+def compute_decryption_share(
+    guardian_id: GUARDIAN_ID,
+    key_pair: ElGamalKeyPair,
+    extended_base_hash: ElementModQ,
+    selection: CiphertextTallySelection,
+) -> Optional[CiphertextDecryptionSelection]:
+    """
+    Same as `compute_decryption_share_for_selection`, with only the election
+    key pair of the guardian so the rest of its secrets stay in the trustee.
+    """
+    share = selection.ciphertext.partial_decrypt(key_pair.secret_key)
+    proof = make_chaum_pedersen(
+        selection.ciphertext, key_pair.secret_key, share, rand_q(), extended_base_hash
+    )
+    if not proof.is_valid(
+        selection.ciphertext, key_pair.public_key, share, extended_base_hash
+    ):
+        return None
+
+    return create_ciphertext_decryption_selection(
+        selection.object_id, guardian_id, selection.description_hash, share, proof
+    )
+
 
 class ProcessCreateElection(ElectionStep):
     order: int
@@ -46,9 +163,7 @@ class ProcessCreateElection(ElectionStep):
         ]
         context.guardian_ids = set(guardian_ids)
         order = guardian_ids.index(context.guardian_id)
-        context.guardian = Guardian(
-            context.guardian_id, order, context.number_of_guardians, context.quorum
-        )
+        context.guardian = context.build_guardian(order)
 
         return [], ProcessStartKeyCeremony()
 
@@ -65,7 +180,9 @@ class ProcessStartKeyCeremony(ElectionStep):
         return [
             {
                 "message_type": "key_ceremony.trustee_election_keys",
-                "content": serialize(context.guardian.share_public_keys()),
+                "content": context.serialize_reply(
+                    context.guardian.share_public_keys()
+                ),
             }
         ], ProcessTrusteeElectionKeys()
 
@@ -90,12 +207,12 @@ class ProcessTrusteeElectionKeys(ElectionStep):
         if not self.mine_received or not context.guardian.all_public_keys_received():
             return [], None
 
-        context.guardian.generate_election_partial_key_backups()
+        generate_election_partial_key_backups(context.guardian, context.scheduler)
 
         return [
             {
                 "message_type": "key_ceremony.trustee_partial_election_keys",
-                "content": serialize(
+                "content": context.serialize_reply(
                     TrusteePartialKeys(
                         guardian_id=context.guardian_id,
                         partial_keys=[
@@ -121,15 +238,20 @@ class ProcessTrusteePartialElectionKeys(ElectionStep):
         message: Content,
         context: TrusteeContext,
     ) -> Tuple[List[Content], Optional[ElectionStep]]:
-        content = deserialize(message["content"], TrusteePartialKeys)
-        if content.guardian_id == context.guardian_id:
+        # only the backup designated to this trustee is deserialized, the
+        # backups for the other trustees are left as plain values
+        content = parse_content(message["content"])
+        if content["guardian_id"] == context.guardian_id:
             self.mine_received = True
         else:
-            for partial_keys_backup in content.partial_keys:
-                if partial_keys_backup.designated_id == context.guardian_id:
+            for partial_keys_backup in content["partial_keys"]:
+                if partial_keys_backup["designated_id"] == context.guardian_id:
                     context.guardian.save_election_partial_key_backup(
-                        partial_keys_backup
+                        deserialize_from_dict(
+                            partial_keys_backup, ElectionPartialKeyBackup
+                        )
                     )
+                    break
 
         if (
             not self.mine_received
@@ -142,16 +264,18 @@ class ProcessTrusteePartialElectionKeys(ElectionStep):
         return [
             {
                 "message_type": "key_ceremony.trustee_verification",
-                "content": serialize(
+                "content": context.serialize_reply(
                     TrusteeVerification(
                         guardian_id=context.guardian_id,
-                        verifications=[
-                            context.guardian.verify_election_partial_key_backup(
+                        verifications=verify_election_partial_key_backups(
+                            context.guardian,
+                            [
                                 guardian_id
-                            )
-                            for guardian_id in context.guardian_ids
-                            if context.guardian_id != guardian_id
-                        ],
+                                for guardian_id in context.guardian_ids
+                                if context.guardian_id != guardian_id
+                            ],
+                            context.scheduler,
+                        ),
                     )
                 ),
             }
@@ -193,9 +317,7 @@ class ProcessEndKeyCeremony(ElectionStep):
     ) -> Tuple[List[Content], ElectionStep]:
         joint_key = deserialize(message["content"], JointElectionKey)
         context.election_builder.set_public_key(get_optional(joint_key.joint_key))
-        context.election_metadata, context.election_context = get_optional(
-            context.election_builder.build()
-        )
+        context.build_election_context()
         # TODO: coefficient validation keys???
         # TODO: check joint key, without using private variables if possible
         #         serialize(elgamal_combine_public_keys(context.guardian._guardian_election_public_keys.values()))
@@ -217,27 +339,42 @@ class ProcessTallyCast(ElectionStep):
             message["content"], Dict[CONTEST_ID, CiphertextTallyContest]
         )
 
-        for contest in tally_cast.values():
-            selections: Dict[SELECTION_ID, CiphertextDecryptionSelection] = dict(
-                pair_with_object_id(
-                    compute_decryption_share_for_selection(
-                        context.guardian, selection, context.election_context
-                    )
-                )
-                for (_, selection) in contest.tally_selections.items()
-            )
+        # shares are computed in parallel and reassembled in the tally order,
+        # with the election key pair sent once to every worker
+        work_units = [
+            (contest, selection)
+            for contest in tally_cast.values()
+            for selection in contest.tally_selections.values()
+        ]
+        shares: List[CiphertextDecryptionSelection] = context.scheduler.schedule(
+            compute_decryption_share,
+            [(selection,) for (_, selection) in work_units],
+            shared_arguments=(
+                context.guardian_id,
+                context.guardian._election_keys.key_pair,
+                context.election_context.crypto_extended_base_hash,
+            ),
+        )
 
+        selections: Dict[
+            CONTEST_ID, Dict[SELECTION_ID, CiphertextDecryptionSelection]
+        ] = {contest_id: {} for contest_id in tally_cast}
+        for (contest, _), share in zip(work_units, shares):
+            selection_id, selection_share = pair_with_object_id(share)
+            selections[contest.object_id][selection_id] = selection_share
+
+        for contest in tally_cast.values():
             contests[contest.object_id] = CiphertextDecryptionContest(
                 contest.object_id,
                 context.guardian_id,
                 contest.description_hash,
-                selections,
+                selections[contest.object_id],
             )
 
         return [
             {
                 "message_type": "tally.trustee_share",
-                "content": serialize(
+                "content": context.serialize_reply(
                     TrusteeShare(
                         guardian_id=context.guardian_id,
                         public_key=context.guardian.share_election_public_key().key,
@@ -272,10 +409,23 @@ class ProcessPublishResults(ElectionStep):
 class Trustee(Wrapper[TrusteeContext]):
     starting_step = ProcessCreateElection
 
-    def __init__(self, guardian_id: GUARDIAN_ID, recorder=None) -> None:
+    def __init__(
+        self,
+        guardian_id: GUARDIAN_ID,
+        recorder=None,
+        scheduler: Optional[Scheduler] = None,
+        guardian_key_store: Optional[GuardianKeyStore] = None,
+    ) -> None:
+        """
+        With a `guardian_key_store`, the guardian keys are taken from the keys
+        generated beforehand for the election scheme instead of being
+        generated when the election is created.
+        """
         super().__init__(
             TrusteeContext(guardian_id), self.starting_step(), recorder=recorder
         )
+        self.context.scheduler = scheduler or DummyScheduler()
+        self.context.guardian_key_store = guardian_key_store
 
     def is_key_ceremony_done(self) -> bool:
         return self.step.__class__ in [
@@ -1,5 +1,17 @@
-from typing import TypeVar, Type
-from electionguard.serializable import write_json_object, write_json, read_json
+import json
+from typing import Any, TypeVar, Type, Union
+from electionguard.ballot import CiphertextBallot
+from electionguard.group import ElementModP
+from electionguard.serializable import (
+    write_json_object,
+    write_json,
+    read_json,
+    read_json_object,
+)
+from jsons import DeserializationError
+from .binary_serialization import decode_binary, encode_binary
+from .compact_ballot import compact_ballot, expand_ballot, is_compact
+from .fast_codec import decoder_for, encode_ballot, encoder_for, json_values
 from .serializable import monkey_patch_serialization
 
 
@@ -7,20 +19,100 @@ monkey_patch_serialization()
 
 
 def serialize(obj, include_private: bool = False) -> str:
+    encoder = None if include_private else encoder_for(obj)
+    if encoder:
+        return json.dumps(json_values(encoder(obj)))
     return write_json(obj, not include_private)
 
 
 def serialize_as_dict(obj, include_private: bool = False) -> dict:
+    encoder = None if include_private else encoder_for(obj)
+    if encoder:
+        return json_values(encoder(obj))
     return write_json_object(obj, not include_private)
 
 
+# Encodings of the message contents, negotiated per message
+JSON_ENCODING = "json"
+BINARY_ENCODING = "binary"
+ENCODINGS = (JSON_ENCODING, BINARY_ENCODING)
+
+
+def content_encoding(content: Union[str, bytes]) -> str:
+    if isinstance(content, (bytes, bytearray)):
+        return BINARY_ENCODING
+    return JSON_ENCODING
+
+
+def serialize_content(obj, encoding: str = JSON_ENCODING) -> Union[str, bytes]:
+    if encoding == JSON_ENCODING:
+        return serialize(obj)
+    encoder = encoder_for(obj)
+    return encode_values(encoder(obj) if encoder else write_json_object(obj), encoding)
+
+
+def serialize_ballot(
+    ballot: CiphertextBallot, encoding: str = JSON_ENCODING, compact: bool = False
+) -> Union[str, bytes]:
+    if not compact:
+        return serialize_content(ballot, encoding)
+    return encode_values(compact_ballot(encode_ballot(ballot)), encoding)
+
+
+def encode_values(values: Any, encoding: str) -> Union[str, bytes]:
+    if encoding == JSON_ENCODING:
+        return json.dumps(json_values(values))
+    if encoding == BINARY_ENCODING:
+        return encode_binary(values)
+    raise UnsupportedEncoding(encoding)
+
+
+def parse_content(content: Union[str, bytes]) -> Any:
+    if isinstance(content, (bytes, bytearray)):
+        return decode_binary(content)
+    return json.loads(content)
+
+
 T = TypeVar("T")
 
 
-def deserialize(obj: str, type: Type[T]) -> T:
+def deserialize(obj: Union[str, bytes], type: Type[T]) -> T:
+    if isinstance(obj, (bytes, bytearray)):
+        return deserialize_from_dict(decode(obj, type, decode_binary), type)
+
+    decoder = decoder_for(type)
+    if decoder:
+        return decode(json.loads(obj), type, decoder)
     return read_json(obj, type)
 
 
+def deserialize_from_dict(obj: dict, type: Type[T]) -> T:
+    decoder = decoder_for(type)
+    if decoder:
+        return decode(obj, type, decoder)
+    return read_json_object(obj, type)
+
+
+def deserialize_ballot(
+    obj: Union[str, bytes, dict], public_key: ElementModP
+) -> CiphertextBallot:
+    # compact ballots get their proof commitments back before being decoded
+    values = obj if isinstance(obj, dict) else parse_content(obj)
+    if is_compact(values):
+        values = decode(
+            values, CiphertextBallot, lambda values: expand_ballot(values, public_key)
+        )
+    return deserialize_from_dict(values, CiphertextBallot)
+
+
+def decode(obj, type, decoder):
+    # malformed content raises the same error as the jsons based decoding
+    try:
+        return decoder(obj)
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError) as error:
+        raise DeserializationError(str(error), obj, type)
+
+
 class InvalidElectionDescription(Exception):
     """Exception raised when the election description is invalid."""
 
@@ -39,6 +131,39 @@ class InvalidBallot(Exception):
     pass
 
 
+class InvalidPartialTally(Exception):
+    """Exception raised when the received partial tally can't be merged."""
+
+    pass
+
+
+class InvalidTrusteeShare(Exception):
+    """Exception raised when a trustee share doesn't prove a correct decryption."""
+
+    pass
+
+
+class InvalidDiscreteLogTable(Exception):
+    """Exception raised when a discrete log table file can't be used with the election group."""
+
+    pass
+
+
+class InvalidGuardianKeys(Exception):
+    """Exception raised when a guardian keys file can't be decrypted with the given passphrase."""
+
+    pass
+
+
+class UnsupportedEncoding(Exception):
+    """
+    Exception raised when a message asks for an unknown content encoding, or
+    declares an encoding that doesn't match its content.
+    """
+
+    pass
+
+
 def pair_with_object_id(obj):
     return (obj.object_id, obj)
 
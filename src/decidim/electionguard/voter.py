@@ -3,18 +3,139 @@ from electionguard.ballot import (
     PlaintextBallotContest,
     PlaintextBallotSelection,
 )
+from electionguard.election import (
+    CiphertextElectionContext,
+    InternalElectionDescription,
+)
 from electionguard.encrypt import encrypt_ballot, selection_from
 from electionguard.group import ElementModQ, ElementModP
 from electionguard.utils import get_optional
-from typing import List, Tuple
+from electionguard.types import CONTEST_ID, SELECTION_ID
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from weakref import finalize
 
 from .common import Context, ElectionStep, Wrapper, Content
+from .dummy_scheduler import DummyScheduler, Scheduler
+from .encryption_pads import (
+    EncryptionPadPool,
+    encrypt_ballot_with_pads,
+    make_ballot_pads,
+)
 from .messages import JointElectionKey
-from .utils import MissingJointKey, deserialize, serialize
+from .utils import (
+    JSON_ENCODING,
+    MissingJointKey,
+    deserialize,
+    serialize_ballot,
+)
+
+
+class BallotStylePlan:
+    """
+    Contests and selections of a ballot style compiled once, so building a
+    plaintext ballot is a single pass over indexed arrays. The plaintext
+    selections are shared by every ballot built with the plan.
+    """
+
+    ballot_style: str
+    contest_ids: List[CONTEST_ID]
+    positions: List[Dict[SELECTION_ID, int]]
+    selections: List[List[Tuple[PlaintextBallotSelection, PlaintextBallotSelection]]]
+
+    def __init__(
+        self, election_metadata: InternalElectionDescription, ballot_style: str
+    ) -> None:
+        contests = election_metadata.get_contests_for(ballot_style)
+        self.ballot_style = ballot_style
+        self.contest_ids = [contest.object_id for contest in contests]
+        self.positions = [
+            {
+                selection.object_id: position
+                for position, selection in enumerate(contest.ballot_selections)
+            }
+            for contest in contests
+        ]
+        self.selections = [
+            [
+                (
+                    selection_from(selection, False, False),
+                    selection_from(selection, False, True),
+                )
+                for selection in contest.ballot_selections
+            ]
+            for contest in contests
+        ]
+
+    def plaintext_ballot(self, ballot_id: str, ballot: dict) -> PlaintextBallot:
+        contests: List[PlaintextBallotContest] = []
+        for contest_id, positions, selections in zip(
+            self.contest_ids, self.positions, self.selections
+        ):
+            chosen = [False] * len(selections)
+            for selection_id in ballot[contest_id]:
+                if selection_id in positions:
+                    chosen[positions[selection_id]] = True
+
+            contests.append(
+                PlaintextBallotContest(
+                    contest_id,
+                    [options[choice] for options, choice in zip(selections, chosen)],
+                )
+            )
+
+        return PlaintextBallot(ballot_id, self.ballot_style, contests)
 
 
 class VoterContext(Context):
     joint_key: ElementModP = None
+    ballot_plans: Dict[str, BallotStylePlan]
+    pad_pool_size: int = 0
+    pad_refill_below: Optional[int] = None
+    pad_pool: Optional[EncryptionPadPool] = None
+
+    def __getstate__(self):
+        # pads hold encryption nonces, they are never stored
+        state = self.__dict__.copy()
+        state.pop("pad_pool", None)
+        return state
+
+    def get_pad_pool(self) -> Optional[EncryptionPadPool]:
+        """
+        Starts the precomputation of pads the first time they are needed. It
+        is stopped with `stop_pad_pool` or when the context is discarded.
+        Pads are only precomputed for the first ballot style of the election,
+        ballots of other styles compute theirs when they are encrypted.
+        """
+        if self.pad_pool is None and self.pad_pool_size > 0:
+            self.pad_pool = EncryptionPadPool(
+                self.election_metadata,
+                self.joint_key,
+                self.election_metadata.ballot_styles[0].object_id,
+                self.pad_pool_size,
+                self.pad_refill_below,
+            )
+            self.pad_pool.start()
+            finalize(self, self.pad_pool.stop, False)
+        return self.pad_pool
+
+    def stop_pad_pool(self) -> None:
+        if self.pad_pool:
+            self.pad_pool.stop()
+            self.pad_pool = None
+
+    def build_ballot_plans(self) -> None:
+        self.ballot_plans = {
+            style.object_id: BallotStylePlan(self.election_metadata, style.object_id)
+            for style in self.election_metadata.ballot_styles
+        }
+
+    def ballot_plan(self, ballot_style: Optional[str] = None) -> BallotStylePlan:
+        """Plan for the given ballot style, or the first one of the election"""
+        if "ballot_plans" not in self.__dict__:
+            self.build_ballot_plans()
+        return self.ballot_plans[
+            ballot_style or self.election_metadata.ballot_styles[0].object_id
+        ]
 
 
 class ProcessCreateElection(ElectionStep):
@@ -35,9 +156,9 @@ class ProcessEndKeyCeremony(ElectionStep):
     ) -> Tuple[List[Content], ElectionStep]:
         context.joint_key = deserialize(message["content"], JointElectionKey).joint_key
         context.election_builder.set_public_key(get_optional(context.joint_key))
-        context.election_metadata, context.election_context = get_optional(
-            context.election_builder.build()
-        )
+        context.build_election_context()
+        context.build_ballot_plans()
+        context.get_pad_pool()
         return [], ProcessStartVote()
 
 
@@ -53,41 +174,131 @@ class ProcessStartVote(ElectionStep):
 class Voter(Wrapper[VoterContext]):
     ballot_id: str
 
-    def __init__(self, ballot_id: str, recorder=None) -> None:
+    def __init__(
+        self,
+        ballot_id: str,
+        recorder=None,
+        scheduler: Optional[Scheduler] = None,
+        pad_pool_size: int = 0,
+        pad_refill_below: Optional[int] = None,
+    ) -> None:
+        """
+        With a `pad_pool_size`, the voter precomputes that many encryption pads
+        in the background once the joint key is known, and computes more when
+        less than `pad_refill_below` are left.
+        """
         super().__init__(VoterContext(), ProcessCreateElection(), recorder=recorder)
         self.ballot_id = ballot_id
+        self.context.scheduler = scheduler or DummyScheduler()
+        self.context.pad_pool_size = pad_pool_size
+        self.context.pad_refill_below = pad_refill_below
 
-    def encrypt(self, ballot: dict, deterministic: bool = False) -> dict:
+    def encrypt(
+        self,
+        ballot: dict,
+        deterministic: bool = False,
+        ballot_style: Optional[str] = None,
+        encoding: str = JSON_ENCODING,
+        compact: bool = False,
+    ) -> Union[str, bytes]:
         if not self.context.joint_key:
             raise MissingJointKey()
 
-        ballot_style: str = self.context.election.ballot_styles[0].object_id
-        contests: List[PlaintextBallotContest] = []
+        plan = self.context.ballot_plan(ballot_style)
 
-        for contest in self.context.election_metadata.get_contests_for(ballot_style):
-            selections: List[PlaintextBallotSelection] = [
-                selection_from(
-                    selection, False, selection.object_id in ballot[contest.object_id]
+        # TODO: store the audit information somewhere
+        # TODO: return both auditable and encrypted ballot
+        pad_pool = self.context.get_pad_pool()
+        if pad_pool and not deterministic:
+            if pad_pool.ballot_style == plan.ballot_style:
+                pads = pad_pool.take()
+            else:
+                pads = make_ballot_pads(
+                    self.context.election_metadata,
+                    self.context.joint_key,
+                    plan.ballot_style,
                 )
-                for selection in contest.ballot_selections
-            ]
 
-            contests.append(PlaintextBallotContest(contest.object_id, selections))
+            return serialize_ballot(
+                encrypt_ballot_with_pads(
+                    plan.plaintext_ballot(self.ballot_id, ballot),
+                    self.context.election_metadata,
+                    self.context.election_context,
+                    ElementModQ(0),
+                    pads,
+                    True,
+                ),
+                encoding,
+                compact,
+            )
 
-        plaintext_ballot = PlaintextBallot(self.ballot_id, ballot_style, contests)
+        return encrypt_plaintext_ballot(
+            plan,
+            self.context.election_metadata,
+            self.context.election_context,
+            # deterministic ballots use the joint key as encryption nonce
+            self.context.joint_key if deterministic else None,
+            encoding,
+            compact,
+            self.ballot_id,
+            ballot,
+        )[1]
 
-        # TODO: store the audit information somewhere
+    def encrypt_many(
+        self,
+        ballots: Iterable[Tuple[str, dict]],
+        deterministic: bool = False,
+        ballot_style: Optional[str] = None,
+        encoding: str = JSON_ENCODING,
+        compact: bool = False,
+    ) -> Iterator[Tuple[str, Union[str, bytes]]]:
+        """
+        Encrypts a stream of (ballot id, selections) pairs with the voter's
+        scheduler, yielding (ballot id, encrypted ballot) pairs as they complete.
+        The election and the ballot plan are sent once to every worker, and the
+        stream is read as the encrypted ballots are consumed.
+        """
+        if not self.context.joint_key:
+            raise MissingJointKey()
 
-        encrypted_ballot = serialize(
-            encrypt_ballot(
-                plaintext_ballot,
+        return self.context.scheduler.schedule_unordered(
+            encrypt_plaintext_ballot,
+            ballots,
+            shared_arguments=(
+                self.context.ballot_plan(ballot_style),
                 self.context.election_metadata,
                 self.context.election_context,
-                ElementModQ(0),
                 self.context.joint_key if deterministic else None,
-                True,
-            )
+                encoding,
+                compact,
+            ),
         )
-        # TODO: return both auditable and encrypted ballot
 
-        return encrypted_ballot
+
+def encrypt_plaintext_ballot(
+    plan: BallotStylePlan,
+    election_metadata: InternalElectionDescription,
+    election_context: CiphertextElectionContext,
+    nonce: Optional[ElementModQ],
+    encoding: str,
+    compact: bool,
+    ballot_id: str,
+    ballot: dict,
+) -> Tuple[str, Union[str, bytes]]:
+    """
+    Encrypts a ballot with electionguard's `encrypt_ballot`. A `nonce` makes
+    the encryption deterministic, otherwise random nonces are used.
+    """
+    encrypted_ballot = serialize_ballot(
+        encrypt_ballot(
+            plan.plaintext_ballot(ballot_id, ballot),
+            election_metadata,
+            election_context,
+            ElementModQ(0),
+            nonce,
+            True,
+        ),
+        encoding,
+        compact,
+    )
+    return ballot_id, encrypted_ballot
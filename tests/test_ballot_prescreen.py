@@ -0,0 +1,82 @@
+import unittest
+import json
+from copy import deepcopy
+from electionguard.group import P
+from decidim.electionguard.ballot_prescreen import BallotPrescreen
+from decidim.electionguard.serializable import int_to_maybe_base64
+from decidim.electionguard.voter import Voter
+from .utils import create_election_test_message, joint_election_key_test_message
+
+
+class TestBallotPrescreen(unittest.TestCase):
+    def setUp(self):
+        voter = Voter("a-voter")
+        voter.process_message("create_election", create_election_test_message())
+        voter.process_message("end_key_ceremony", joint_election_key_test_message())
+
+        self.prescreen = BallotPrescreen(voter.context.election_metadata)
+        self.ballot = json.loads(
+            voter.encrypt(
+                {
+                    "question1": ["question1-no-selection"],
+                    "question2": ["question2-first-project-selection"],
+                }
+            )
+        )
+
+    def test_valid_ballot(self):
+        assert self.prescreen.is_valid(self.ballot)
+
+    def test_garbage(self):
+        for garbage in [None, "a ballot", [], {}, {"ballot_style": []}]:
+            assert not self.prescreen.is_valid(garbage)
+
+    def test_wrong_election(self):
+        assert not self.mutated(lambda ballot: ballot.update(description_hash=1))
+        assert not self.mutated(lambda ballot: ballot.update(ballot_style="other"))
+
+    def test_wrong_contests(self):
+        assert not self.mutated(lambda ballot: ballot["contests"].pop())
+        assert not self.mutated(
+            lambda ballot: ballot["contests"].append(ballot["contests"][0])
+        )
+        assert not self.mutated(
+            lambda ballot: ballot["contests"][0].update(object_id="question3")
+        )
+        assert not self.mutated(
+            lambda ballot: ballot["contests"][0]["proof"].update(constant=2)
+        )
+
+    def test_wrong_selections(self):
+        def selection(ballot):
+            return ballot["contests"][1]["ballot_selections"][0]
+
+        assert not self.mutated(
+            lambda ballot: selection(ballot).update(object_id="question2-other")
+        )
+        assert not self.mutated(
+            lambda ballot: selection(ballot).update(is_placeholder_selection=True)
+        )
+        assert not self.mutated(
+            lambda ballot: selection(ballot).update(description_hash=1)
+        )
+        assert not self.mutated(
+            lambda ballot: selection(ballot)["ciphertext"].update(pad=-1)
+        )
+        assert not self.mutated(
+            lambda ballot: selection(ballot)["proof"].update(
+                proof_zero_pad=int_to_maybe_base64(P)
+            )
+        )
+        assert not self.mutated(
+            lambda ballot: selection(ballot)["proof"].update(challenge="not base64!")
+        )
+
+    def mutated(self, mutation):
+        ballot = deepcopy(self.ballot)
+        mutation(ballot)
+        return self.prescreen.is_valid(ballot)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import unittest
+from dataclasses import replace
+from secrets import randbits
+from electionguard.chaum_pedersen import (
+    make_chaum_pedersen,
+    make_constant_chaum_pedersen,
+    make_disjunctive_chaum_pedersen,
+)
+from electionguard.elgamal import (
+    elgamal_add,
+    elgamal_encrypt,
+    elgamal_keypair_from_secret,
+)
+from electionguard.group import (
+    P,
+    Q,
+    add_q,
+    g_pow_p,
+    int_to_p_unchecked,
+    int_to_q_unchecked,
+    pow_p,
+    rand_q,
+)
+from decidim.electionguard.batch_verifier import (
+    ProofBatch,
+    elements_are_valid_residues,
+    multi_exp,
+    weighted_product,
+)
+
+
+class TestBatchVerifier(unittest.TestCase):
+    def setUp(self):
+        self.secret_key = int_to_q_unchecked(12345)
+        self.public_key = elgamal_keypair_from_secret(self.secret_key).public_key
+        self.extended_base_hash = rand_q()
+
+        self.selections = []
+        nonces = []
+        for plaintext in [0, 1, 1, 0]:
+            nonce = rand_q()
+            message = elgamal_encrypt(plaintext, nonce, self.public_key)
+            proof = make_disjunctive_chaum_pedersen(
+                message,
+                nonce,
+                self.public_key,
+                self.extended_base_hash,
+                rand_q(),
+                plaintext,
+            )
+            self.selections.append((proof, message))
+            nonces.append(nonce)
+
+        self.accumulation = elgamal_add(*[message for (_, message) in self.selections])
+        self.contest_proof = make_constant_chaum_pedersen(
+            self.accumulation,
+            2,
+            add_q(*nonces),
+            self.public_key,
+            rand_q(),
+            self.extended_base_hash,
+        )
+
+    def test_multi_exp(self):
+        terms = [(3, 0), (5, 1), (7, 2**64 + 3), (11, P - 2)]
+        expected = 1
+        for base, exponent in terms:
+            expected = expected * pow(base, exponent, P) % P
+
+        assert multi_exp(terms) == expected
+        assert multi_exp([]) == 1
+
+    def test_valid_proofs(self):
+        batch = self.new_batch()
+        for proof, message in self.selections:
+            assert batch.add_disjunctive(proof, message)
+        assert batch.add_constant(self.contest_proof, self.accumulation)
+
+        assert batch.is_valid()
+
+    def test_invalid_proof(self):
+        (proof, message), (other_proof, _) = self.selections[:2]
+        tampered_proof = replace(
+            proof, proof_zero_response=other_proof.proof_zero_response
+        )
+        assert not self.new_batch().add_disjunctive(
+            replace(tampered_proof, challenge=rand_q()), message
+        )
+
+        # the challenge is still valid, so only the combined check can detect it
+        batch = self.new_batch()
+        assert batch.add_disjunctive(tampered_proof, message)
+        assert batch.add_constant(self.contest_proof, self.accumulation)
+        assert not batch.is_valid()
+
+    def test_invalid_constant(self):
+        batch = self.new_batch()
+        assert batch.add_constant(
+            replace(self.contest_proof, constant=3), self.accumulation
+        )
+        assert not batch.is_valid()
+
+    def test_weighted_product(self):
+        for count in [1, 3, 40]:
+            values = [g_pow_p(rand_q()).elem for _ in range(count)]
+            weights = [randbits(64) for _ in values]
+            expected = 1
+            for value, weight in zip(values, weights):
+                expected = expected * pow(value, weight, P) % P
+
+            assert weighted_product(values, weights) == expected
+
+    def test_valid_residues(self):
+        elements = [g_pow_p(rand_q()) for _ in range(8)]
+        assert elements_are_valid_residues(elements)
+        assert elements_are_valid_residues([])
+
+        # an element of order 2 and one of the order r subgroup
+        outside = [
+            int_to_p_unchecked(P - 1),
+            pow_p(int_to_p_unchecked(3), int_to_p_unchecked(2 * Q)),
+        ]
+        for element in outside + [int_to_p_unchecked(0), int_to_p_unchecked(P)]:
+            assert not elements_are_valid_residues(elements + [element])
+        assert not elements_are_valid_residues(
+            elements[1:] + [int_to_p_unchecked(elements[0].elem * outside[1].elem % P)]
+        )
+
+    def test_decryption_proofs(self):
+        batch = self.new_batch()
+        for _, message in self.selections:
+            share = pow_p(message.pad, self.secret_key)
+            proof = make_chaum_pedersen(
+                message, self.secret_key, share, rand_q(), self.extended_base_hash
+            )
+            assert batch.add_chaum_pedersen(proof, message, share)
+        assert batch.is_valid()
+
+        # another share doesn't match the challenge, a wrong response only
+        # fails the combined check
+        assert not self.new_batch().add_chaum_pedersen(
+            proof, message, g_pow_p(rand_q())
+        )
+        batch = self.new_batch()
+        assert batch.add_chaum_pedersen(
+            replace(proof, response=add_q(proof.response, 1)), message, share
+        )
+        assert not batch.is_valid()
+
+    def new_batch(self):
+        return ProofBatch(self.public_key, self.extended_base_hash)
+
+
+if __name__ == "__main__":
+    unittest.main()
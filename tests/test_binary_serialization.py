@@ -0,0 +1,126 @@
+import unittest
+from electionguard.ballot import CiphertextBallot
+from electionguard.group import P
+from electionguard.guardian import Guardian
+from electionguard.key_ceremony import PublicKeySet
+from decidim.electionguard.bulletin_board import BulletinBoard
+from decidim.electionguard.binary_serialization import decode_binary, encode_binary
+from decidim.electionguard.messages import JointElectionKey, TrusteePartialKeys
+from decidim.electionguard.trustee import Trustee
+from decidim.electionguard.utils import (
+    BINARY_ENCODING,
+    deserialize,
+    JSON_ENCODING,
+    parse_content,
+    serialize,
+    serialize_content,
+    UnsupportedEncoding,
+)
+from decidim.electionguard.voter import Voter
+from .utils import create_election_test_message, joint_election_key_test_message
+
+
+class TestBinarySerialization(unittest.TestCase):
+    def setUp(self):
+        self.voter = Voter("a-voter")
+        self.voter.process_message("create_election", create_election_test_message())
+        self.voter.process_message(
+            "end_key_ceremony", joint_election_key_test_message()
+        )
+
+    def test_values(self):
+        value = {
+            "a": [None, True, False, 0, -1, 255, 2**300, -(2**70)],
+            "b": {"ñ": "ünicode", "": []},
+        }
+        assert decode_binary(encode_binary(value)) == value
+
+        # integers larger than p that aren't group elements
+        large = [int(P) ** 3, -(2**4096), 2**2040]
+        assert decode_binary(encode_binary(large)) == large
+
+    def test_ballot(self):
+        content = self.voter.encrypt(
+            {"question1": ["question1-yes-selection"], "question2": []},
+            encoding=BINARY_ENCODING,
+        )
+        assert isinstance(content, bytes)
+
+        ballot = deserialize(content, CiphertextBallot)
+        assert serialize_content(ballot, BINARY_ENCODING) == content
+        assert len(content) < len(serialize(ballot))
+        assert parse_content(content)["object_id"] == ballot.object_id
+
+    def test_fallback(self):
+        # types without a hand-written codec are encoded from their jsons values
+        joint_key = JointElectionKey(joint_key=self.voter.context.joint_key)
+        content = serialize_content(joint_key, BINARY_ENCODING)
+        assert deserialize(content, JointElectionKey) == joint_key
+
+    def test_key_ceremony(self):
+        guardian = Guardian("bob", 1, 3, 2)
+        trustee = Trustee("alicia")
+        trustee.process_message("create_election", create_election_test_message())
+        [public_keys] = trustee.process_message(
+            "start_key_ceremony", {"content": None, "encoding": BINARY_ENCODING}
+        )
+        assert public_keys["encoding"] == BINARY_ENCODING
+        assert deserialize(public_keys["content"], PublicKeySet).owner_id == "alicia"
+
+        # replies follow the encoding of each message
+        trustee.process_message(public_keys["message_type"], public_keys)
+        trustee.process_message(
+            "key_ceremony.trustee_election_keys",
+            {"content": serialize(guardian.share_public_keys())},
+        )
+        [partial_keys] = trustee.process_message(
+            "key_ceremony.trustee_election_keys",
+            {"content": serialize(Guardian("clara", 2, 3, 2).share_public_keys())},
+        )
+        assert "encoding" not in partial_keys
+        assert isinstance(
+            deserialize(partial_keys["content"], TrusteePartialKeys), TrusteePartialKeys
+        )
+
+    def test_malformed(self):
+        content = serialize_content(self.voter.context.joint_key, BINARY_ENCODING)
+        for malformed in [content[:-1], content + b"\0", b"EGB\x01x", b"not binary"]:
+            with self.assertRaises(ValueError):
+                decode_binary(malformed)
+
+        with self.assertRaises(UnsupportedEncoding):
+            serialize_content(self.voter.context.joint_key, "xml")
+        with self.assertRaises(UnsupportedEncoding):
+            Trustee("alicia").process_message(
+                "create_election", {"content": None, "encoding": "xml"}
+            )
+
+    def test_mismatched_encoding(self):
+        trustee = Trustee("alicia")
+        trustee.process_message("create_election", create_election_test_message())
+        for message in [
+            {"content": "{}", "encoding": BINARY_ENCODING},
+            {"content": b"EGB\x01", "encoding": JSON_ENCODING},
+        ]:
+            with self.assertRaises(UnsupportedEncoding):
+                trustee.process_message("start_key_ceremony", message)
+
+    def test_broadcast_encoding(self):
+        bulletin_board = BulletinBoard()
+        bulletin_board.process_message(
+            "create_election", create_election_test_message()
+        )
+        bulletin_board.process_message(
+            "start_key_ceremony", {"content": None, "encoding": BINARY_ENCODING}
+        )
+        assert bulletin_board.context.encoding == JSON_ENCODING
+        assert bulletin_board.context.serialize({"a": 1}) == '{"a": 1}'
+        assert isinstance(
+            BulletinBoard(encoding=BINARY_ENCODING).context.serialize({"a": 1}), bytes
+        )
+        with self.assertRaises(UnsupportedEncoding):
+            BulletinBoard(encoding="xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
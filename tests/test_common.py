@@ -0,0 +1,47 @@
+import unittest
+from decidim.electionguard.common import LRUCache
+from decidim.electionguard.voter import Voter
+from .utils import create_election_test_message, joint_election_key_test_message
+
+
+class TestElectionCache(unittest.TestCase):
+    def test_lru_cache(self):
+        cache = LRUCache(2)
+        assert cache.get_or_build("a", lambda: 1) == 1
+        assert cache.get_or_build("b", lambda: 2) == 2
+        assert cache.get_or_build("a", lambda: 3) == 1
+        assert cache.get_or_build("c", lambda: 4) == 4
+
+        assert len(cache) == 2
+        assert cache.get_or_build("b", lambda: 5) == 5
+        assert cache.get_or_build("c", lambda: 6) == 4
+
+    def test_shared_election(self):
+        voters = [self.voter_with_key(f"a-voter-{i}") for i in range(2)]
+
+        first, second = (voter.context for voter in voters)
+        assert first.election is second.election
+        assert first.election_metadata is second.election_metadata
+        assert first.election_context is second.election_context
+        assert first.election_builder is not second.election_builder
+
+    def test_different_elections(self):
+        election = create_election_test_message()
+        election["scheme"]["quorum"] = 3
+        voter = Voter("a-voter")
+        voter.process_message("create_election", election)
+
+        other_voter = self.voter_with_key("another-voter")
+        assert voter.context.quorum == 3
+        assert other_voter.context.quorum == 2
+        assert voter.context.election is not other_voter.context.election
+
+    def voter_with_key(self, ballot_id):
+        voter = Voter(ballot_id)
+        voter.process_message("create_election", create_election_test_message())
+        voter.process_message("end_key_ceremony", joint_election_key_test_message())
+        return voter
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import json
+import unittest
+from electionguard.ballot import CiphertextBallot
+from electionguard.guardian import Guardian
+from decidim.electionguard.bulletin_board import BulletinBoard
+from decidim.electionguard.messages import TrusteePartialKeys, TrusteeVerification
+from decidim.electionguard.utils import (
+    BINARY_ENCODING,
+    InvalidBallot,
+    deserialize,
+    deserialize_ballot,
+    serialize,
+    serialize_ballot,
+)
+from decidim.electionguard.voter import Voter
+from .utils import create_election_test_message, start_vote_message
+
+
+class TestCompactBallot(unittest.TestCase):
+    def setUp(self):
+        election_message = create_election_test_message()
+        self.bulletin_board = BulletinBoard()
+        self.bulletin_board.process_message("create_election", election_message)
+        self.bulletin_board.process_message("start_key_ceremony", None)
+        for order, trustee in enumerate(election_message["trustees"]):
+            guardian = Guardian(trustee["name"], order, 3, 2)
+            self.bulletin_board.process_message(
+                "key_ceremony.trustee_election_keys",
+                {"content": serialize(guardian.share_public_keys())},
+            )
+        for trustee in election_message["trustees"]:
+            self.bulletin_board.process_message(
+                "key_ceremony.trustee_partial_election_keys",
+                {
+                    "content": serialize(
+                        TrusteePartialKeys(guardian_id=trustee["name"], partial_keys=[])
+                    )
+                },
+            )
+        for trustee in election_message["trustees"]:
+            joint_key = self.bulletin_board.process_message(
+                "key_ceremony.trustee_verification",
+                {
+                    "content": serialize(
+                        TrusteeVerification(
+                            guardian_id=trustee["name"], verifications=[]
+                        )
+                    )
+                },
+            )
+        self.bulletin_board.process_message("start_vote", start_vote_message())
+
+        self.voters = [Voter(f"voter-{i}") for i in range(3)]
+        for voter in self.voters:
+            voter.process_message("create_election", election_message)
+            voter.process_message("end_key_ceremony", joint_key[0])
+        self.public_key = self.voters[0].context.joint_key
+
+    def encrypt(self, voter, **options):
+        return voter.encrypt(
+            {
+                "question1": ["question1-yes-selection"],
+                "question2": ["question2-second-project-selection"],
+            },
+            **options,
+        )
+
+    def test_round_trip(self):
+        ballot = deserialize(self.encrypt(self.voters[0]), CiphertextBallot)
+        for encoding in ["json", BINARY_ENCODING]:
+            content = serialize_ballot(ballot, encoding)
+            compact = serialize_ballot(ballot, encoding, compact=True)
+            assert len(compact) < len(content) * 0.8
+            assert deserialize_ballot(compact, self.public_key) == ballot
+            assert deserialize_ballot(content, self.public_key) == ballot
+
+    def test_cast(self):
+        self.bulletin_board.process_message(
+            "vote.cast", {"content": self.encrypt(self.voters[0], compact=True)}
+        )
+        results = self.bulletin_board.cast_ballots(
+            {"content": self.encrypt(voter, encoding=BINARY_ENCODING, compact=True)}
+            for voter in self.voters[1:]
+        )
+        assert results == [True, True]
+        assert self.bulletin_board.context.tally.count() == 3
+
+    def test_forged_proof(self):
+        forged_ballot = json.loads(self.encrypt(self.voters[0], compact=True))
+        selections = forged_ballot["contests"][0]["ballot_selections"]
+        selections[0]["proof"]["proof_zero_response"] = selections[1]["proof"][
+            "proof_zero_response"
+        ]
+        content = json.dumps(forged_ballot)
+
+        assert self.bulletin_board.cast_ballots([{"content": content}]) == [False]
+        with self.assertRaises(InvalidBallot):
+            self.bulletin_board.process_message("vote.cast", {"content": content})
+
+
+if __name__ == "__main__":
+    unittest.main()
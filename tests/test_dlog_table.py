@@ -0,0 +1,91 @@
+import os
+import unittest
+import pickle
+from pathlib import Path
+from unittest.mock import patch
+from tempfile import TemporaryDirectory
+from electionguard.group import g_pow_p, int_to_q_unchecked
+from decidim.electionguard.dlog_table import (
+    DiscreteLogPrecomputation,
+    DiscreteLogTable,
+)
+from decidim.electionguard.utils import InvalidDiscreteLogTable
+
+
+class TestDiscreteLogTable(unittest.TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path = DiscreteLogTable.path_for(Path(self.directory.name))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_lookup(self):
+        table = DiscreteLogTable.precompute(self.path, 1000)
+        assert table.max_exponent == 1000
+
+        for exponent in [0, 1, 2, 500, 999, 1000]:
+            element = g_pow_p(int_to_q_unchecked(exponent))
+            assert table.lookup(element) == exponent
+            assert table.discrete_log(element) == exponent
+
+        assert table.lookup(g_pow_p(int_to_q_unchecked(1001))) is None
+        assert table.discrete_log(g_pow_p(int_to_q_unchecked(1001))) == 1001
+        table.close()
+
+    def test_reuse(self):
+        DiscreteLogTable.precompute(self.path, 100).close()
+        table = DiscreteLogTable(self.path)
+        assert table.lookup(g_pow_p(int_to_q_unchecked(42))) == 42
+        assert table.max_exponent == 100
+
+        restored = pickle.loads(pickle.dumps(table))
+        table.close()
+        assert restored.lookup(g_pow_p(int_to_q_unchecked(43))) == 43
+        restored.close()
+
+    def test_missing_or_invalid_file(self):
+        assert (
+            DiscreteLogTable(self.path).lookup(g_pow_p(int_to_q_unchecked(1))) is None
+        )
+
+        self.path.write_bytes(b"not a table")
+        with self.assertRaises(InvalidDiscreteLogTable):
+            DiscreteLogTable(self.path).lookup(g_pow_p(int_to_q_unchecked(1)))
+
+        table = DiscreteLogTable.precompute(self.path, 10)
+        assert table.lookup(g_pow_p(int_to_q_unchecked(10))) == 10
+        table.close()
+
+    def test_extend_replaces_the_table(self):
+        table = DiscreteLogTable.precompute(self.path, 10)
+        table.lookup(g_pow_p(int_to_q_unchecked(10)))
+        DiscreteLogTable.precompute(self.path, 20).close()
+
+        # the mapped table is still readable after being replaced
+        assert table.lookup(g_pow_p(int_to_q_unchecked(10))) == 10
+        table.close()
+        assert DiscreteLogTable(self.path).lookup(g_pow_p(int_to_q_unchecked(20))) == 20
+        assert list(self.path.parent.iterdir()) == [self.path]
+
+    def test_cache_directory(self):
+        with patch.dict(os.environ, {"XDG_CACHE_HOME": self.directory.name}):
+            directory = DiscreteLogTable.cache_directory()
+        assert directory == Path(self.directory.name) / "decidim-electionguard"
+        assert directory.stat().st_mode & 0o777 == 0o700
+
+    def test_precomputation(self):
+        table = DiscreteLogTable(self.path)
+        precomputation = DiscreteLogPrecomputation(table)
+        precomputation.start()
+        precomputation.request(10)
+        precomputation.request(1500)
+        precomputation.stop()
+
+        assert table.lookup(g_pow_p(int_to_q_unchecked(1500))) == 1500
+        assert table.max_exponent >= 1500
+        table.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
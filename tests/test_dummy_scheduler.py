@@ -0,0 +1,97 @@
+import unittest
+import pickle
+from decidim.electionguard.dummy_scheduler import DummyScheduler, PoolScheduler
+
+
+class TestPoolScheduler(unittest.TestCase):
+    def setUp(self):
+        self.arguments = [(base, 3, 1000) for base in range(50)]
+        self.expected = DummyScheduler().schedule(pow, self.arguments)
+
+    def test_processes(self):
+        with PoolScheduler(max_workers=2) as scheduler:
+            assert scheduler.schedule(pow, self.arguments) == self.expected
+
+    def test_threads(self):
+        with PoolScheduler(max_workers=2, use_processes=False) as scheduler:
+            assert scheduler.schedule(pow, self.arguments) == self.expected
+            assert (
+                scheduler.schedule(pow, self.arguments, with_shared_resources=True)
+                == self.expected
+            )
+
+    def test_unordered(self):
+        assert list(DummyScheduler().schedule_unordered(pow, self.arguments)) == (
+            self.expected
+        )
+        with PoolScheduler(max_workers=2) as scheduler:
+            results = scheduler.schedule_unordered(pow, iter(self.arguments))
+            assert sorted(results) == sorted(self.expected)
+
+    def test_shared_arguments(self):
+        arguments = [(exponent, 1000) for exponent in range(50)]
+        expected = [pow(2, exponent, 1000) for exponent in range(50)]
+        assert DummyScheduler().schedule(pow, arguments, shared_arguments=(2,)) == (
+            expected
+        )
+        for use_processes in [True, False]:
+            with PoolScheduler(max_workers=2, use_processes=use_processes) as scheduler:
+                assert (
+                    scheduler.schedule(pow, arguments, shared_arguments=(2,))
+                    == expected
+                )
+                results = scheduler.schedule_unordered(
+                    pow, iter(arguments), shared_arguments=(2,)
+                )
+                assert sorted(results) == sorted(expected)
+
+    def test_pool_reuse(self):
+        arguments = [(exponent, 1000) for exponent in range(50)]
+        with PoolScheduler(max_workers=2) as scheduler:
+            scheduler.schedule(pow, arguments, shared_arguments=(2,))
+            pool = scheduler._process_pool
+            for base in range(3, 8):
+                assert scheduler.schedule(pow, arguments, shared_arguments=(base,)) == [
+                    pow(base, exponent, 1000) for exponent in range(50)
+                ]
+                list(
+                    scheduler.schedule_unordered(
+                        pow, arguments, shared_arguments=(base,)
+                    )
+                )
+            assert scheduler._process_pool is pool
+
+    def test_unordered_backpressure(self):
+        read = []
+
+        def arguments():
+            for base in range(100):
+                read.append(base)
+                yield (base, 3, 1000)
+
+        with PoolScheduler(max_workers=2, chunksize=1) as scheduler:
+            results = scheduler.schedule_unordered(pow, arguments())
+            next(results)
+            # at most 4 chunks per worker in flight
+            assert len(read) <= 9
+            assert len(list(results)) == 99
+
+    def test_chunksize(self):
+        scheduler = PoolScheduler(max_workers=2)
+        assert scheduler._chunksize_for(1) == 1
+        assert scheduler._chunksize_for(80) == 10
+        assert PoolScheduler(max_workers=2, chunksize=3)._chunksize_for(80) == 3
+
+    def test_pickle(self):
+        scheduler = PoolScheduler(max_workers=2)
+        scheduler.schedule(pow, self.arguments)
+        restored = pickle.loads(pickle.dumps(scheduler))
+        scheduler.close()
+
+        assert restored.max_workers == 2
+        assert restored.schedule(pow, self.arguments) == self.expected
+        restored.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
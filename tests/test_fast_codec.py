@@ -0,0 +1,140 @@
+import json
+from typing import Dict
+import unittest
+from electionguard.ballot import (
+    BallotBoxState,
+    CiphertextBallot,
+    from_ciphertext_ballot,
+)
+from electionguard.decryption import compute_decryption_share_for_selection
+from electionguard.decryption_share import CiphertextDecryptionContest
+from electionguard.guardian import Guardian
+from electionguard.key_ceremony import ElectionPartialKeyBackup, PublicKeySet
+from electionguard.serializable import read_json, write_json
+from electionguard.tally import CiphertextTally, CiphertextTallyContest
+from jsons import DeserializationError
+from decidim.electionguard.dummy_scheduler import DummyScheduler
+from decidim.electionguard.messages import TrusteePartialKeys, TrusteeShare
+from decidim.electionguard.utils import (
+    BINARY_ENCODING,
+    deserialize,
+    deserialize_from_dict,
+    serialize,
+    serialize_as_dict,
+    serialize_content,
+)
+from decidim.electionguard.voter import Voter
+from .utils import create_election_test_message, joint_election_key_test_message
+
+
+class TestFastCodec(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        voter = Voter("a-voter")
+        voter.process_message("create_election", create_election_test_message())
+        voter.process_message("end_key_ceremony", joint_election_key_test_message())
+        cls.context = voter.context
+        cls.ballot = voter.encrypt(
+            {"question1": ["question1-yes-selection"], "question2": []}
+        )
+
+        cls.guardians = [Guardian(name, order, 2, 2) for order, name in enumerate("ab")]
+        first, second = cls.guardians
+        first.save_guardian_public_keys(second.share_public_keys())
+        first.generate_election_partial_key_backups()
+
+    def assert_same_as_jsons(self, obj, type):
+        content = write_json(obj)
+        assert serialize(obj) == content
+        assert serialize_as_dict(obj) == json.loads(content)
+
+        decoded = deserialize(content, type)
+        assert decoded == read_json(content, type)
+        assert serialize(decoded) == content
+        return decoded
+
+    def test_ballot(self):
+        ballot = self.assert_same_as_jsons(
+            deserialize(self.ballot, CiphertextBallot), CiphertextBallot
+        )
+        assert ballot.is_valid_encryption(
+            ballot.description_hash,
+            self.context.election_context.elgamal_public_key,
+            self.context.election_context.crypto_extended_base_hash,
+        )
+
+    def test_key_ceremony(self):
+        first, second = self.guardians
+        self.assert_same_as_jsons(first.share_public_keys(), PublicKeySet)
+
+        backup = first.share_election_partial_key_backup(second.object_id)
+        self.assert_same_as_jsons(backup, ElectionPartialKeyBackup)
+        assert deserialize_from_dict(
+            serialize_as_dict(backup), ElectionPartialKeyBackup
+        ) == read_json(write_json(backup), ElectionPartialKeyBackup)
+
+        self.assert_same_as_jsons(
+            TrusteePartialKeys(guardian_id=first.object_id, partial_keys=[backup]),
+            TrusteePartialKeys,
+        )
+
+    def test_tally(self):
+        tally = CiphertextTally(
+            "election-results",
+            self.context.election_metadata,
+            self.context.election_context,
+        )
+        tally.append(
+            from_ciphertext_ballot(
+                deserialize(self.ballot, CiphertextBallot), BallotBoxState.CAST
+            ),
+            DummyScheduler(),
+        )
+        tally_cast = self.assert_same_as_jsons(
+            tally.cast, Dict[str, CiphertextTallyContest]
+        )
+
+        guardian = self.guardians[0]
+        contests = {
+            contest.object_id: CiphertextDecryptionContest(
+                contest.object_id,
+                guardian.object_id,
+                contest.description_hash,
+                {
+                    selection.object_id: compute_decryption_share_for_selection(
+                        guardian, selection, self.context.election_context
+                    )
+                    for selection in contest.tally_selections.values()
+                },
+            )
+            for contest in tally_cast.values()
+        }
+        self.assert_same_as_jsons(
+            TrusteeShare(
+                guardian_id=guardian.object_id,
+                public_key=guardian.share_election_public_key().key,
+                contests=contests,
+            ),
+            TrusteeShare,
+        )
+
+    def test_malformed(self):
+        with self.assertRaises(DeserializationError):
+            deserialize('{"object_id": "a-voter"}', CiphertextBallot)
+        with self.assertRaises(DeserializationError):
+            deserialize('{"guardian_id": "a", "partial_keys": [1]}', TrusteePartialKeys)
+
+        corrupted_ballot = json.loads(self.ballot)
+        corrupted_ballot["crypto_hash"] = "not base64!"
+        with self.assertRaises(DeserializationError):
+            deserialize(json.dumps(corrupted_ballot), CiphertextBallot)
+
+        binary_ballot = serialize_content(
+            deserialize(self.ballot, CiphertextBallot), BINARY_ENCODING
+        )
+        with self.assertRaises(DeserializationError):
+            deserialize(binary_ballot[:-1], CiphertextBallot)
+
+
+if __name__ == "__main__":
+    unittest.main()
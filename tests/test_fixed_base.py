@@ -0,0 +1,72 @@
+import unittest
+import electionguard.elgamal
+from electionguard.elgamal import elgamal_encrypt, elgamal_keypair_from_secret
+from electionguard.group import G, P, Q, int_to_q_unchecked, rand_q
+from gmpy2 import powmod
+from decidim.electionguard import fixed_base
+from decidim.electionguard.fixed_base import (
+    FixedBaseTable,
+    g_pow_p,
+    pow_p,
+    register_fixed_bases,
+)
+
+
+class TestFixedBase(unittest.TestCase):
+    def setUp(self):
+        self.public_key = elgamal_keypair_from_secret(rand_q()).public_key
+
+    def test_table(self):
+        table = FixedBaseTable(G)
+        for exponent in [0, 1, 255, 256, Q - 1, rand_q().to_int()]:
+            assert table.pow(exponent) == powmod(G, exponent, P)
+
+    def test_register(self):
+        nonce = rand_q()
+        expected = elgamal_encrypt(1, nonce, self.public_key)
+
+        register_fixed_bases(self.public_key)
+        assert electionguard.elgamal.pow_p is pow_p
+        assert self.public_key.elem in fixed_base._tables
+        assert elgamal_encrypt(1, nonce, self.public_key) == expected
+
+        exponent = rand_q()
+        assert g_pow_p(exponent).elem == powmod(G, exponent.elem, P)
+        assert pow_p(self.public_key, exponent).elem == powmod(
+            self.public_key.elem, exponent.elem, P
+        )
+        # exponents out of the tables fall back to the usual exponentiation
+        assert pow_p(self.public_key, P - 1).elem == powmod(
+            self.public_key.elem, P - 1, P
+        )
+
+    def test_limit_joint_keys(self):
+        keys = [
+            elgamal_keypair_from_secret(int_to_q_unchecked(secret)).public_key
+            for secret in range(2, fixed_base.MAX_JOINT_KEYS + 3)
+        ]
+        for key in keys:
+            register_fixed_bases(key)
+
+        assert G in fixed_base._tables
+        assert keys[0].elem not in fixed_base._tables
+        assert keys[-1].elem in fixed_base._tables
+        assert len(fixed_base._tables) == fixed_base.MAX_JOINT_KEYS + 1
+
+    def test_keep_used_joint_keys(self):
+        keys = [
+            elgamal_keypair_from_secret(int_to_q_unchecked(secret)).public_key
+            for secret in range(2, fixed_base.MAX_JOINT_KEYS + 3)
+        ]
+        for key in keys[:-1]:
+            register_fixed_bases(key)
+
+        # the least recently used table is dropped, not the oldest one
+        pow_p(keys[0], rand_q())
+        register_fixed_bases(keys[-1])
+        assert keys[0].elem in fixed_base._tables
+        assert keys[1].elem not in fixed_base._tables
+
+
+if __name__ == "__main__":
+    unittest.main()
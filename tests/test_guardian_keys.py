@@ -0,0 +1,78 @@
+from multiprocessing import Pool
+from pathlib import Path
+from shutil import copyfile
+from tempfile import TemporaryDirectory
+import unittest
+from decidim.electionguard.guardian_keys import GuardianKeyStore, PregeneratedGuardian
+from decidim.electionguard.trustee import Trustee
+from decidim.electionguard.utils import InvalidGuardianKeys
+from .utils import create_election_test_message
+
+
+class TestGuardianKeys(unittest.TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.store = GuardianKeyStore(Path(self.directory.name), "a passphrase")
+        self.store.precompute(3, 2, 2)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_take(self):
+        assert self.store.available(3, 2) == 2
+        assert self.store.available(5, 3) == 0
+        assert self.store.take(5, 3) is None
+
+        first = self.store.take(3, 2)
+        assert len(first.election_keys.polynomial.coefficients) == 2
+        assert self.store.available(3, 2) == 1
+        assert self.store.take(3, 2) != first
+        assert self.store.take(3, 2) is None
+
+    def test_concurrent_take(self):
+        with Pool(3) as pool:
+            taken = pool.starmap(take_keys, [(self.directory.name, 3, 2)] * 3)
+
+        keys = [key for key in taken if key is not None]
+        assert len(keys) == 2 and keys[0] != keys[1]
+        assert self.store.available(3, 2) == 0
+        assert [path.suffix for path in sorted(self.store.directory.iterdir())] == [
+            ".bin",
+            ".lock",
+        ]
+
+    def test_wrong_passphrase(self):
+        store = GuardianKeyStore(Path(self.directory.name), "another passphrase")
+        with self.assertRaises(InvalidGuardianKeys):
+            store.take(3, 2)
+
+    def test_trustee(self):
+        copy = GuardianKeyStore(Path(self.directory.name) / "copy", "a passphrase")
+        copy.directory.mkdir()
+        copyfile(self.store.path_for(3, 2), copy.path_for(3, 2))
+        keys = copy.take(3, 2)
+
+        trustee = Trustee("alicia", guardian_key_store=self.store)
+        trustee.process_message("create_election", create_election_test_message())
+        guardian = trustee.context.guardian
+        assert isinstance(guardian, PregeneratedGuardian)
+        assert self.store.available(3, 2) == 1
+
+        public_keys = guardian.share_public_keys()
+        assert public_keys.auxiliary_public_key == keys.auxiliary_keys.public_key
+        assert public_keys.election_public_key == keys.election_keys.key_pair.public_key
+        assert guardian.guardian_election_public_keys().get("alicia") is not None
+
+        restored = Trustee.restore(trustee.backup())
+        assert restored.context.guardian_key_store is None
+        assert restored.context.guardian.share_public_keys() == public_keys
+
+
+def take_keys(directory: str, number_of_guardians: int, quorum: int):
+    return GuardianKeyStore(Path(directory), "a passphrase").take(
+        number_of_guardians, quorum
+    )
+
+
+if __name__ == "__main__":
+    unittest.main()
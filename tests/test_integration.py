@@ -3,12 +3,23 @@ import unittest
 from random import choice, sample
 import json
 from pathlib import Path
+from tempfile import TemporaryDirectory
 from electionguard.ballot import CiphertextBallot
-from decidim.electionguard.bulletin_board import BulletinBoard
+from decidim.electionguard.bulletin_board import BulletinBoard, accept_ballot
 from decidim.electionguard.common import Recorder
+from decidim.electionguard.dlog_table import DiscreteLogTable
+from decidim.electionguard.dummy_scheduler import PoolScheduler
 from decidim.electionguard.trustee import Trustee
 from decidim.electionguard.voter import Voter
-from decidim.electionguard.utils import InvalidBallot
+from decidim.electionguard.utils import (
+    BINARY_ENCODING,
+    InvalidBallot,
+    InvalidPartialTally,
+    JSON_ENCODING,
+    deserialize_ballot,
+    parse_content,
+    serialize,
+)
 from .utils import (
     create_election_test_message,
     start_vote_message,
@@ -37,13 +48,55 @@ class TestIntegration(unittest.TestCase):
     def test_without_state(self):
         self.reset_state = True
         self.show_output = False
+        with TemporaryDirectory() as directory:
+            self.dlog_table_path = DiscreteLogTable.precompute(
+                DiscreteLogTable.path_for(Path(directory)), NUMBER_OF_VOTERS
+            ).path
+            self.configure_election()
+            self.key_ceremony()
+            self.encrypt_ballots()
+            self.cast_votes()
+            self.decrypt_tally()
+            self.publish_and_verify()
+
+    def test_batch_cast(self):
+        self.reset_state = False
+        self.show_output = False
+        with TemporaryDirectory() as directory:
+            self.dlog_table_path = DiscreteLogTable.path_for(Path(directory))
+            self.precompute_dlog = True
+            self.configure_election()
+            self.key_ceremony()
+            self.encrypt_ballots()
+            self.cast_votes_in_batch()
+            self.decrypt_tally()
+            self.publish_and_verify()
+
+    def test_sharded_cast(self):
+        self.reset_state = False
+        self.show_output = False
         self.configure_election()
         self.key_ceremony()
         self.encrypt_ballots()
-        self.cast_votes()
+        self.cast_votes_in_shards()
         self.decrypt_tally()
         self.publish_and_verify()
 
+    def test_binary_encoding(self):
+        self.reset_state = False
+        self.show_output = False
+        self.encoding = BINARY_ENCODING
+        with TemporaryDirectory() as directory:
+            with Recorder(output_path=Path(directory)) as recorder:
+                self.configure_election(recorder)
+                self.key_ceremony()
+                assert self.joint_election_key["encoding"] == BINARY_ENCODING
+                assert isinstance(self.joint_election_key["content"], bytes)
+                self.encrypt_ballots()
+                self.cast_votes()
+                self.decrypt_tally()
+                self.publish_and_verify()
+
     def checkpoint(self, step, output=None):
         if self.show_output:
             if output:
@@ -61,11 +114,15 @@ class TestIntegration(unittest.TestCase):
 
     def configure_election(self, recorder=None):
         self.election_message = create_election_test_message()
-        self.bulletin_board = BulletinBoard(recorder=recorder)
+        self.bulletin_board = BulletinBoard(
+            recorder=recorder,
+            dlog_table_path=getattr(self, "dlog_table_path", None),
+            precompute_dlog=getattr(self, "precompute_dlog", False),
+            encoding=getattr(self, "encoding", JSON_ENCODING),
+        )
         self.trustees = [
-            Trustee("alicia", recorder=recorder),
-            Trustee("bob", recorder=recorder),
-            Trustee("clara", recorder=recorder),
+            Trustee(name, recorder=recorder, scheduler=PoolScheduler(max_workers=2))
+            for name in ["alicia", "bob", "clara"]
         ]
         self.voters = [
             Voter(f"the-voter-{i}", recorder=recorder)
@@ -73,14 +130,19 @@ class TestIntegration(unittest.TestCase):
         ]
 
     def key_ceremony(self):
+        # the trustees reply with the encoding of the message they receive, the
+        # bulletin board broadcasts with its own encoding
+        encoding = getattr(self, "encoding", JSON_ENCODING)
+        start_key_ceremony = {"content": None, "encoding": encoding}
+
         self.bulletin_board.process_message("create_election", self.election_message)
-        self.bulletin_board.process_message("start_key_ceremony", None)
+        self.bulletin_board.process_message("start_key_ceremony", start_key_ceremony)
 
         for trustee in self.trustees:
             trustee.process_message("create_election", self.election_message)
 
         trustees_public_keys = [
-            trustee.process_message("start_key_ceremony", None)[0]
+            trustee.process_message("start_key_ceremony", start_key_ceremony)[0]
             for trustee in self.trustees
         ]
 
@@ -170,6 +232,7 @@ class TestIntegration(unittest.TestCase):
         ]
 
         self.encrypted_ballots: List[CiphertextBallot] = []
+        self.plaintext_ballots: List[dict] = []
         for voter in self.voters:
             voter.process_message("create_election", self.election_message)
             voter.process_message(
@@ -184,7 +247,10 @@ class TestIntegration(unittest.TestCase):
                 )
                 for contest in possible_answers
             )
-            self.encrypted_ballots.append(voter.encrypt(ballot))
+            self.encrypted_ballots.append(
+                voter.encrypt(ballot, encoding=getattr(self, "encoding", JSON_ENCODING))
+            )
+            self.plaintext_ballots.append(ballot)
 
         voter = Voter("a-voter", recorder=recorder)
         voter.process_message("create_election", self.election_message)
@@ -194,6 +260,7 @@ class TestIntegration(unittest.TestCase):
         voter.process_message("start_vote", start_vote_message())
         encrypted_ballot = voter.encrypt(ballot, True)
         self.encrypted_ballots.append(encrypted_ballot)
+        self.plaintext_ballots.append(ballot)
 
     def cast_votes(self):
         self.bulletin_board.process_message("start_vote", start_vote_message())
@@ -201,8 +268,8 @@ class TestIntegration(unittest.TestCase):
 
         self.accepted_ballots: List[CiphertextBallot] = []
 
-        for encrypted_ballot in self.encrypted_ballots:
-            voter_id = json.loads(encrypted_ballot)["object_id"]
+        for encrypted_ballot in self.encrypted_ballots[:-1]:
+            voter_id = parse_content(encrypted_ballot)["object_id"]
             try:
                 self.bulletin_board.process_message(
                     "vote.cast", {"content": encrypted_ballot}
@@ -212,15 +279,146 @@ class TestIntegration(unittest.TestCase):
             except InvalidBallot:
                 self.checkpoint("BALLOT REJECTED " + voter_id)
 
+        self.cast_repeated_votes()
+
         self.bulletin_board.process_message("end_vote", end_vote_message())
         self.checkpoint("END VOTE")
 
+        # ballots can still be validated and added to the tally after the vote
+        assert self.bulletin_board.add_ballot(self.encrypted_ballots[-1])
+        self.accepted_ballots.append(self.encrypted_ballots[-1])
+
+    def cast_repeated_votes(self):
+        # replayed ballots are acknowledged without being counted twice
+        self.bulletin_board.process_message(
+            "vote.cast", {"content": self.accepted_ballots[0]}
+        )
+        assert len(self.bulletin_board.context.ballot_index) == len(
+            self.accepted_ballots
+        )
+
+        # the same ballot id can't be reused for a different ballot
+        conflicting_ballot = parse_content(self.accepted_ballots[0])
+        conflicting_ballot["crypto_hash"] = parse_content(self.accepted_ballots[1])[
+            "crypto_hash"
+        ]
+        with self.assertRaises(InvalidBallot):
+            self.bulletin_board.process_message(
+                "vote.cast", {"content": json.dumps(conflicting_ballot)}
+            )
+
+        # neither can a tampered copy of an accepted ballot
+        tampered_ballot = parse_content(self.accepted_ballots[0])
+        tampered_ballot["contests"] = []
+        with self.assertRaises(InvalidBallot):
+            self.bulletin_board.process_message(
+                "vote.cast", {"content": json.dumps(tampered_ballot)}
+            )
+
+        # a ballot that can't be accumulated is neither tallied nor recorded
+        context = self.bulletin_board.context
+        tally_cast = serialize(context.tally.cast)
+        broken_ballot = deserialize_ballot(
+            self.accepted_ballots[1], context.election_context.elgamal_public_key
+        )
+        broken_ballot.object_id = "a-broken-ballot"
+        broken_ballot.contests[-1].ballot_selections = []
+        with self.assertRaises(InvalidBallot):
+            accept_ballot(context, broken_ballot, b"")
+        assert serialize(context.tally.cast) == tally_cast
+        assert "a-broken-ballot" not in context.ballot_index.hashes
+        self.checkpoint("REPEATED BALLOTS")
+
+    def cast_votes_in_batch(self):
+        assert self.bulletin_board.cast_ballots([]) == []
+        assert self.bulletin_board.cast_ballots(
+            {"content": encrypted_ballot} for encrypted_ballot in self.encrypted_ballots
+        ) == [False] * len(self.encrypted_ballots)
+        self.bulletin_board.process_message("start_vote", start_vote_message())
+
+        # a ballot with a forged proof, sharing its verification batch with valid ones
+        forged_ballot = json.loads(self.encrypted_ballots[0])
+        selections = forged_ballot["contests"][0]["ballot_selections"]
+        selections[0]["proof"]["proof_zero_response"] = selections[1]["proof"][
+            "proof_zero_response"
+        ]
+
+        results = self.bulletin_board.cast_ballots(
+            {"content": encrypted_ballot}
+            for encrypted_ballot in [json.dumps(forged_ballot)]
+            + self.encrypted_ballots
+            + [
+                "{}",
+                "not a ballot",
+                self.encrypted_ballots[0],
+                json.dumps({**json.loads(self.encrypted_ballots[1]), "contests": []}),
+            ]
+        )
+        assert results == [False] + [True] * len(self.encrypted_ballots) + [
+            False,
+            False,
+            True,
+            False,
+        ]
+        self.accepted_ballots = list(self.encrypted_ballots)
+
+        results = self.bulletin_board.cast_ballots(
+            [{"content": self.encrypted_ballots[1]}]
+        )
+        assert results == [True]
+        assert len(self.bulletin_board.context.ballot_index) == len(
+            self.accepted_ballots
+        )
+
+        self.bulletin_board.process_message("end_vote", end_vote_message())
+
+    def cast_votes_in_shards(self):
+        self.bulletin_board.process_message("start_vote", start_vote_message())
+        shard = BulletinBoard.restore(self.bulletin_board.backup())
+
+        half = len(self.encrypted_ballots) // 2
+        for bulletin_board, encrypted_ballots in [
+            (self.bulletin_board, self.encrypted_ballots[:half]),
+            (shard, self.encrypted_ballots[half:]),
+        ]:
+            for encrypted_ballot in encrypted_ballots:
+                bulletin_board.process_message(
+                    "vote.cast", {"content": encrypted_ballot}
+                )
+        self.accepted_ballots = list(self.encrypted_ballots)
+
+        partial_tally = shard.get_partial_tally()
+        self.bulletin_board.process_message(
+            partial_tally["message_type"], partial_tally
+        )
+        with self.assertRaises(InvalidPartialTally):
+            self.bulletin_board.process_message(
+                partial_tally["message_type"], partial_tally
+            )
+
+        # ballots accepted by the shard are acknowledged again by the coordinator
+        self.bulletin_board.process_message(
+            "vote.cast", {"content": self.encrypted_ballots[-1]}
+        )
+        assert self.bulletin_board.cast_ballots(
+            [{"content": self.encrypted_ballots[half]}]
+        ) == [True]
+
+        self.bulletin_board.process_message("end_vote", end_vote_message())
+        assert len(self.bulletin_board.context.ballot_index) == len(
+            self.accepted_ballots
+        )
+
     def decrypt_tally(self):
         self.bulletin_board.process_message("start_tally", start_tally_message())
         self.checkpoint("START TALLY")
 
+        # the accepted ballots are already part of the tally
         for ballot in self.accepted_ballots:
-            self.bulletin_board.add_ballot(ballot)
+            assert not self.bulletin_board.add_ballot(ballot)
+        assert len(self.bulletin_board.context.ballot_index) == len(
+            self.accepted_ballots
+        )
 
         tally_cast = self.bulletin_board.get_tally_cast()
 
@@ -239,6 +437,7 @@ class TestIntegration(unittest.TestCase):
                 end_tally = res[0]
 
         self.checkpoint("END TALLY", end_tally)
+        self.assert_results(end_tally["results"])
 
         for trustee in self.trustees:
             assert trustee.is_key_ceremony_done()
@@ -253,6 +452,22 @@ class TestIntegration(unittest.TestCase):
                 for selection_id, tally in question.items():
                     print(f"Option {selection_id}: " + str(tally))
 
+    def assert_results(self, results):
+        accepted_ids = [
+            parse_content(ballot)["object_id"] for ballot in self.accepted_ballots
+        ]
+        for question_id, question in results.items():
+            for selection_id, tally in question.items():
+                expected = sum(
+                    1
+                    for (encrypted_ballot, ballot) in zip(
+                        self.encrypted_ballots, self.plaintext_ballots
+                    )
+                    if parse_content(encrypted_ballot)["object_id"] in accepted_ids
+                    and selection_id in ballot[question_id]
+                )
+                assert tally == expected
+
     def publish_and_verify(self):
         # see publish.py
         pass
@@ -0,0 +1,47 @@
+import unittest
+from electionguard.group import P
+from decidim.electionguard.serializable import (
+    CONVERSION_CACHE_SIZE,
+    ENCODE_THRESHOLD,
+    clear_conversion_caches,
+    conversion_cache_stats,
+    int_to_maybe_base64,
+    maybe_base64_to_int,
+)
+
+
+class TestSerializable(unittest.TestCase):
+    def setUp(self):
+        clear_conversion_caches()
+
+    def test_small_integers(self):
+        assert int_to_maybe_base64(ENCODE_THRESHOLD - 1) == ENCODE_THRESHOLD - 1
+        assert maybe_base64_to_int(42) == 42
+        assert all(
+            stats["hits"] == stats["misses"] == 0
+            for stats in conversion_cache_stats().values()
+        )
+
+    def test_cached_conversions(self):
+        value = int(P) - 1
+        encoded = int_to_maybe_base64(value)
+        assert int_to_maybe_base64(value) == encoded
+        assert maybe_base64_to_int(encoded) == value
+        assert maybe_base64_to_int(encoded) == value
+
+        stats = conversion_cache_stats()
+        assert stats["int_to_base64"]["hits"] == stats["int_to_base64"]["misses"] == 1
+        assert stats["base64_to_int"]["hits"] == stats["base64_to_int"]["misses"] == 1
+
+    def test_bounded(self):
+        for value in range(
+            ENCODE_THRESHOLD, ENCODE_THRESHOLD + CONVERSION_CACHE_SIZE + 10
+        ):
+            assert maybe_base64_to_int(int_to_maybe_base64(value)) == value
+
+        for stats in conversion_cache_stats().values():
+            assert stats["size"] == stats["maxsize"] == CONVERSION_CACHE_SIZE
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,10 @@
+import json
 from typing import List
 import unittest
 from electionguard.elgamal import elgamal_combine_public_keys
 from electionguard.key_ceremony import PublicKeySet
+from decidim.electionguard.dummy_scheduler import PoolScheduler
+from decidim.electionguard.messages import TrusteeVerification
 from decidim.electionguard.trustee import Trustee
 from decidim.electionguard.utils import serialize, deserialize
 from decidim.electionguard.common import Content
@@ -10,7 +13,10 @@ from .utils import create_election_test_message
 
 class TestTrustee(unittest.TestCase):
     def setUp(self):
-        self.trustees = [Trustee("alicia"), Trustee("bob"), Trustee("clara")]
+        self.trustees = [
+            Trustee(name, scheduler=PoolScheduler(max_workers=2))
+            for name in ["alicia", "bob", "clara"]
+        ]
 
     def test_key_ceremony(self):
         for trustee in self.trustees:
@@ -70,6 +76,9 @@ class TestTrustee(unittest.TestCase):
 
         # Process verifications results
         for verification in trustees_verifications:
+            content = deserialize(verification["content"], TrusteeVerification)
+            assert len(content.verifications) == len(self.trustees) - 1
+            assert all(result.verified for result in content.verifications)
             for trustee in self.trustees:
                 trustee.process_message(
                     "key_ceremony.trustee_verification", verification
@@ -102,6 +111,46 @@ class TestTrustee(unittest.TestCase):
         # TODO: assert number of selections for each contest
         # TODO: assert decryption of the ballot
 
+    def test_designated_partial_keys(self):
+        for trustee in self.trustees:
+            trustee.process_message("create_election", create_election_test_message())
+        public_keys = [
+            trustee.process_message("start_key_ceremony", None)[0]
+            for trustee in self.trustees
+        ]
+        partial_keys = [
+            result[0]
+            for keys in public_keys
+            for result in [
+                trustee.process_message("key_ceremony.trustee_election_keys", keys)
+                for trustee in self.trustees
+            ]
+            if result
+        ]
+
+        verifications = []
+        for trustee in self.trustees:
+            for message in partial_keys:
+                # the backups designated to other trustees are never read
+                content = json.loads(message["content"])
+                content["partial_keys"] = [
+                    backup
+                    if backup["designated_id"] == trustee.context.guardian_id
+                    else {"designated_id": backup["designated_id"]}
+                    for backup in content["partial_keys"]
+                ]
+                verifications.extend(
+                    trustee.process_message(
+                        "key_ceremony.trustee_partial_election_keys",
+                        {"content": json.dumps(content)},
+                    )
+                )
+
+        assert len(verifications) == len(self.trustees)
+        for verification in verifications:
+            content = deserialize(verification["content"], TrusteeVerification)
+            assert all(result.verified for result in content.verifications)
+
     def test_restore(self):
         pass
         # TODO: backup and restore a trustee between each step
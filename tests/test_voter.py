@@ -1,3 +1,4 @@
+import gc
 import unittest
 from .utils import (
     create_election_test_message,
@@ -5,6 +6,10 @@ from .utils import (
     deterministic_encrypted_ballot,
     remove_unused,
 )
+from electionguard.ballot import CiphertextBallot
+from electionguard.ballot_validator import ballot_is_valid_for_election
+from decidim.electionguard.dummy_scheduler import PoolScheduler
+from decidim.electionguard.utils import deserialize
 from decidim.electionguard.voter import Voter
 
 
@@ -58,6 +63,120 @@ class TestVoter(unittest.TestCase):
             remove_unused(encrypted_ballot), deterministic_encrypted_ballot()
         )
 
+    def test_ballot_plan(self):
+        self.voter.process_message("create_election", create_election_test_message())
+        self.voter.process_message(
+            "end_key_ceremony", joint_election_key_test_message()
+        )
+        plan = self.voter.context.ballot_plan()
+        assert plan is self.voter.context.ballot_plan("ballot-style")
+        with self.assertRaises(KeyError):
+            self.voter.context.ballot_plan("another-style")
+
+        plaintext_ballot = plan.plaintext_ballot(
+            "a-voter",
+            {
+                "question1": ["question1-yes-selection", "unknown-selection"],
+                "question2": ["question2-third-project-selection"],
+            },
+        )
+        assert plaintext_ballot.ballot_style == "ballot-style"
+        assert [
+            [
+                (selection.object_id, selection.vote)
+                for selection in contest.ballot_selections
+            ]
+            for contest in plaintext_ballot.contests
+        ] == [
+            [("question1-yes-selection", "True"), ("question1-no-selection", "False")],
+            [
+                ("question2-first-project-selection", "False"),
+                ("question2-second-project-selection", "False"),
+                ("question2-third-project-selection", "True"),
+                ("question2-fourth-project-selection", "False"),
+            ],
+        ]
+
+    def test_encrypt_many(self):
+        ballots = [
+            (f"a-voter-{i}", {"question1": [], "question2": []}) for i in range(4)
+        ]
+        with PoolScheduler(max_workers=2) as scheduler:
+            voter = Voter("a-voter", scheduler=scheduler)
+            voter.process_message("create_election", create_election_test_message())
+            voter.process_message("end_key_ceremony", joint_election_key_test_message())
+            encrypted_ballots = dict(voter.encrypt_many(iter(ballots), True))
+
+        assert encrypted_ballots.keys() == {ballot_id for ballot_id, _ in ballots}
+        for ballot_id, ballot in ballots:
+            single_voter = Voter(ballot_id)
+            single_voter.process_message(
+                "create_election", create_election_test_message()
+            )
+            single_voter.process_message(
+                "end_key_ceremony", joint_election_key_test_message()
+            )
+            self.assertEqual(
+                remove_unused(encrypted_ballots[ballot_id]),
+                remove_unused(single_voter.encrypt(ballot, True)),
+            )
+
+    def test_pad_pool(self):
+        voter = Voter("a-voter", pad_pool_size=2, pad_refill_below=1)
+        voter.process_message("create_election", create_election_test_message())
+        voter.process_message("end_key_ceremony", joint_election_key_test_message())
+        pad_pool = voter.context.pad_pool
+
+        # more ballots than pads, so some are encrypted without waiting for them
+        for selections in [
+            {"question1": ["question1-yes-selection"], "question2": []},
+            {
+                "question1": ["question1-no-selection"],
+                "question2": [
+                    "question2-first-project-selection",
+                    "question2-third-project-selection",
+                ],
+            },
+            {"question1": [], "question2": ["question2-fourth-project-selection"]},
+        ]:
+            ballot = deserialize(voter.encrypt(selections), CiphertextBallot)
+            assert ballot_is_valid_for_election(
+                ballot,
+                voter.context.election_metadata,
+                voter.context.election_context,
+            )
+
+        # overvotes are not encrypted, as without pads
+        assert (
+            voter.encrypt(
+                {
+                    "question1": ["question1-yes-selection", "question1-no-selection"],
+                    "question2": [],
+                }
+            )
+            == "null"
+        )
+
+        # ballots encrypted with a bad pad are discarded by their proofs
+        pads = pad_pool.take()
+        contest_pad, selection_pads = pads[0]
+        selection_pads[0] = selection_pads[0]._replace(nonce=selection_pads[1].nonce)
+        pad_pool._pads.appendleft(pads)
+        assert (
+            voter.encrypt({"question1": ["question1-yes-selection"], "question2": []})
+            == "null"
+        )
+
+        restored = Voter.restore(voter.backup())
+        assert restored.context.pad_pool is None
+
+        # the pool stops when the voter is discarded
+        del voter
+        gc.collect()
+        pad_pool.join(timeout=10)
+        assert not pad_pool.is_alive()
+        assert len(pad_pool) <= 2
+
 
 if __name__ == "__main__":
     unittest.main()